@@ -0,0 +1,133 @@
+"""
+Runs strategies over many containers files and store widths in parallel:
+
+    python3 batch.py fitxer*.txt --widths 20 30 --strategies simple expert [--jobs 4] [--logs logs] [--output summary.csv]
+
+Every (containers file, width, strategy) job runs the strategy headless in a worker
+process, validates its log and the results (final cash, actions and runtime) of all
+the jobs are written in one table, in the same order as if they were run one by one.
+"""
+
+
+import argparse
+import csv
+import importlib
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from validate import validate
+
+
+@dataclass
+class JobResult:
+    """Result of running a strategy on a containers file with a store of a certain width."""
+
+    containers: str
+    width: int
+    strategy: str
+    ok: bool
+    cash: int
+    adds: int
+    moves: int
+    removes: int
+    runtime: float  # seconds of execute_strategy
+    error: str = ''
+
+
+Job = Tuple[str, int, str, str]  # containers path, width, strategy module, log path
+
+
+def run_job(job: Job) -> JobResult:
+    """Runs a job (in a worker process) and validates its log"""
+
+    containers_path, width, strategy, log_path = job
+    start = time.perf_counter()
+    try:
+        importlib.import_module(strategy).execute_strategy(containers_path, log_path, width)
+    except Exception as error: #a job that fails (a store too narrow, a wrong file...) doesn't stop the others
+        message = str(error) or type(error).__name__
+        return JobResult(containers_path, width, strategy, False, 0, 0, 0, 0,
+                         time.perf_counter() - start, f'strategy failed: {message}')
+    runtime = time.perf_counter() - start
+
+    try:
+        result = validate(containers_path, log_path)
+        with open(log_path) as log:
+            actions = Counter(line.split()[1] for line in log if line.strip())
+    except Exception as error:
+        return JobResult(containers_path, width, strategy, False, 0, 0, 0, 0,
+                         runtime, f'validation failed: {str(error) or type(error).__name__}')
+    error = '' if result.ok else f'line {result.error_line}: {result.error}'
+    return JobResult(containers_path, width, strategy, result.ok, result.cash,
+                     actions['ADD'], actions['MOVE'], actions['REMOVE'], runtime, error)
+
+
+def make_jobs(containers_paths: Sequence[str], widths: Sequence[int], strategies: Sequence[str], logs: str) -> List[Job]:
+    """
+    Returns the jobs of all the combinations of containers files, widths and strategies (the logs
+    of the containers files with the same name have the number of the file in their name too)
+    """
+
+    names = [os.path.splitext(os.path.basename(containers_path))[0] for containers_path in containers_paths]
+    jobs = []
+    for i, containers_path in enumerate(containers_paths):
+        name = names[i] if names.count(names[i]) == 1 else f'{names[i]}-{i}'
+        for width in widths:
+            for strategy in strategies:
+                jobs.append((containers_path, width, strategy, os.path.join(logs, f'{strategy}-{name}-{width}.log')))
+    return jobs
+
+
+def run_batch(jobs: List[Job], workers: Optional[int] = None) -> List[JobResult]:
+    """Runs the jobs in workers processes (or one by one if workers == 1) and returns their results in order"""
+
+    if workers == 1:
+        return [run_job(job) for job in jobs]
+    with ProcessPoolExecutor(workers) as executor:
+        return list(executor.map(run_job, jobs))
+
+
+def write_summary(results: List[JobResult], output: Optional[str]) -> None:
+    """Prints the table of results and writes it as CSV at output"""
+
+    print(f"{'containers':<20} {'width':>5} {'strategy':<10} {'cash':>8} {'adds':>6} {'moves':>7} {'removes':>7} {'time':>8}")
+    for r in results:
+        cash = str(r.cash) if r.ok else 'ERROR'
+        print(f'{os.path.basename(r.containers):<20} {r.width:>5} {r.strategy:<10} {cash:>8} '
+              f'{r.adds:>6} {r.moves:>7} {r.removes:>7} {r.runtime:>8.3f}' + (f'  {r.error}' if r.error else ''))
+
+    if output:
+        with open(output, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=list(asdict(results[0]).keys()) if results else [])
+            writer.writeheader()
+            for r in results:
+                writer.writerow(asdict(r))
+
+
+def main():
+    """main script"""
+
+    parser = argparse.ArgumentParser(description='Runs strategies over many containers files and widths.')
+    parser.add_argument('containers', nargs='+', help='containers files')
+    parser.add_argument('--widths', type=int, nargs='+', default=[20])
+    parser.add_argument('--strategies', nargs='+', default=['simple', 'expert'], help='modules with execute_strategy')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (all the cpus by default)')
+    parser.add_argument('--logs', default='logs', help='directory of the logs')
+    parser.add_argument('--output', help='CSV file with the results')
+    args = parser.parse_args()
+
+    os.makedirs(args.logs, exist_ok=True)
+    results = run_batch(make_jobs(args.containers, args.widths, args.strategies, args.logs), args.jobs)
+    write_summary(results, args.output)
+    if not all(r.ok for r in results):
+        sys.exit(1)
+
+
+# start main script when program executed
+if __name__ == '__main__':
+    main()
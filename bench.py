@@ -0,0 +1,191 @@
+"""
+Benchmarks of the store and the strategies with synthetic containers files:
+
+    python3 bench.py [--scales 1000 4000 16000] [--width 20] [--seed 0] [--output bench.json] [--compare old.json]
+                     [--size-weights 1 1 1 1] [--max-value 30] [--value-skew 1.0] [--max-gap 30]
+                     [--max-delay 5000] [--max-window 2000]
+
+For every scale (number of containers) a containers file is generated (with the settings of
+generate_manifest given by the last options) and the time of
+read_containers, of every Store operation, of execute_strategy of simple.py and expert.py
+and of the validation of their logs is measured. The results are written as JSON, and
+with --compare they are compared with the results of a previous run.
+"""
+
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import tempfile
+import time
+from typing import Callable, List, Sequence
+
+from store import *
+from validate import validate
+import expert
+import simple
+
+
+def generate_manifest(path: str, n: int, seed: int = 0, size_weights: Sequence[float] = (1, 1, 1, 1),
+                      max_value: int = 30, value_skew: float = 1.0, max_gap: int = 30,
+                      max_delay: int = 5000, max_window: int = 2000) -> None:
+    """
+    Writes a containers file at path with n random containers (the same ones for the same seed).
+    The sizes (1 to len(size_weights)) are chosen with the weights size_weights, the values are
+    between 1 and max_value (value_skew > 1 makes the small ones more frequent), every container
+    arrives at most max_gap time units after the previous one, can be delivered at most max_delay
+    time units after its arrival and during at most max_window time units.
+    """
+
+    rnd = random.Random(seed)
+    sizes = list(range(1, len(size_weights) + 1))
+    t = 0
+    with open(path, 'w') as file:
+        lines = []
+        for identifier in range(n):
+            size = rnd.choices(sizes, size_weights)[0]
+            value = 1 + int((max_value - 1) * rnd.random() ** value_skew)
+            arrival = TimeRange(t, t + rnd.randint(1, max_gap))
+            start = arrival.end + rnd.randint(0, max_delay)
+            delivery = TimeRange(start, start + rnd.randint(1, max_window))
+            lines.append(f'{identifier}\t{size}\t{value}\t{arrival.start}\t{arrival.end}\t{delivery.start}\t{delivery.end}\n')
+            t = arrival.end
+        file.write(''.join(lines))
+
+
+def timed(f: Callable[[], object], repeat: int = 1) -> float:
+    """Returns the best time in seconds of repeat calls to f"""
+
+    best = math.inf
+    for i in range(repeat):
+        start = time.perf_counter()
+        f()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_store(containers: List[Container], width: int, seed: int) -> dict:
+    """Returns the time per call (in microseconds) of the operations of a Store filled with the containers"""
+
+    rnd = random.Random(seed)
+    store = Store(width)
+    calls = {'add': 0, 'remove': 0, 'move': 0, 'can_add': 0, 'can_remove': 0, 'location': 0,
+             'top_container': 0, 'height': 0, 'empty': 0, 'containers': 0}
+    totals = dict.fromkeys(calls, 0.0)
+
+    def call(name: str, f: Callable[[], object]) -> object:
+        start = time.perf_counter()
+        result = f()
+        totals[name] += time.perf_counter() - start
+        calls[name] += 1
+        return result
+
+    for c in containers: #we fill the store randomly
+        for tries in range(4):
+            p = rnd.randrange(width - c.size + 1)
+            if call('can_add', lambda: store.can_add(c, p)):
+                call('add', lambda: store.add(c, p))
+                break
+    stored = store.containers()
+    for i in range(len(containers)): #random queries and operations on the full store
+        c = rnd.choice(stored)
+        p = rnd.randrange(width - c.size + 1)
+        call('location', lambda: store.location(c))
+        call('top_container', lambda: store.top_container(p))
+        call('height', lambda: store.height())
+        call('empty', lambda: store.empty())
+        if call('can_remove', lambda: store.can_remove(c)):
+            q = store.location(c)[1]
+            overlaps = p < q + c.size and q < p + c.size #c would be under itself
+            if rnd.random() < 0.5 and not overlaps and store.can_add(c, p):
+                call('move', lambda: store.move(c, p))
+            else:
+                call('remove', lambda: store.remove(c))
+                stored.remove(c)
+                if not stored:
+                    break
+        if i % 100 == 0:
+            call('containers', lambda: store.containers())
+    return {name: 1e6 * totals[name] / calls[name] for name in calls if calls[name]}
+
+
+def bench_scale(n: int, width: int, seed: int, directory: str, **settings) -> dict:
+    """
+    Returns the results of all the benchmarks for a containers file of n containers
+    (generated by generate_manifest with the keyword arguments settings)
+    """
+
+    path = os.path.join(directory, f'containers-{n}.txt')
+    generate_manifest(path, n, seed, **settings)
+    result: dict = {'containers': n, 'width': width}
+    result['read_containers'] = timed(lambda: read_containers(path), 3)
+    result['read_manifest'] = timed(lambda: read_manifest(path), 3)
+    result['store_us_per_call'] = bench_store(read_containers(path), width, seed)
+    for module in (simple, expert):
+        name = module.__name__
+        log_path = os.path.join(directory, f'{name}-{n}.log')
+        result[f'{name}_execute'] = timed(lambda: module.execute_strategy(path, log_path, width))
+        result[f'{name}_validate'] = timed(lambda: validate(path, log_path))
+        result[f'{name}_check'] = timed(lambda: check_and_show(path, log_path))
+        result[f'{name}_cash'] = validate(path, log_path).cash
+        with open(log_path) as log:
+            result[f'{name}_actions'] = sum(1 for line in log) - 1
+    return result
+
+
+def compare(results: List[dict], old_results: List[dict]) -> None:
+    """Prints the ratio new time / old time of the benchmarks of the scales of both runs"""
+
+    old = {r['containers']: r for r in old_results}
+    for r in results:
+        if r['containers'] not in old:
+            continue
+        o = old[r['containers']]
+        for key, value in r.items():
+            if isinstance(value, float) and isinstance(o.get(key), float) and o[key] > 0:
+                print(f"{r['containers']:>8} {key:<20} {o[key]:10.4f} -> {value:10.4f} ({value / o[key]:.2f}x)")
+
+
+def main():
+    """main script"""
+
+    parser = argparse.ArgumentParser(description='Benchmarks of the store and the strategies.')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1000, 4000, 16000], help='numbers of containers')
+    parser.add_argument('--width', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench.json')
+    parser.add_argument('--compare', help='results of a previous run')
+    parser.add_argument('--size-weights', type=float, nargs='+', default=[1, 1, 1, 1],
+                        help='weights of the sizes 1, 2, 3...')
+    parser.add_argument('--max-value', type=int, default=30)
+    parser.add_argument('--value-skew', type=float, default=1.0, help='> 1 makes the small values more frequent')
+    parser.add_argument('--max-gap', type=int, default=30, help='maximum time between two arrivals')
+    parser.add_argument('--max-delay', type=int, default=5000, help='maximum time between an arrival and its delivery')
+    parser.add_argument('--max-window', type=int, default=2000, help='maximum duration of a delivery')
+    args = parser.parse_args()
+    assert args.max_value >= 1 and args.max_gap >= 1 and args.max_delay >= 0 and args.max_window >= 1
+    settings = {'size_weights': args.size_weights, 'max_value': args.max_value, 'value_skew': args.value_skew,
+                'max_gap': args.max_gap, 'max_delay': args.max_delay, 'max_window': args.max_window}
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for n in args.scales:
+            result = bench_scale(n, args.width, args.seed, directory, **settings)
+            results.append(result)
+            print(json.dumps(result))
+
+    with open(args.output, 'w') as file:
+        json.dump({'python': platform.python_version(), 'seed': args.seed, 'manifest': settings,
+                   'results': results}, file, indent=1)
+
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file)['results'])
+
+
+# start main script when program executed
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Lookahead strategy.
+
+Unlike the simple and expert strategies, that go over the stacks blindly, this one uses
+the delivery windows of the containers (the known TimeRanges of the containers file):
+
+- Every size of container has its own stacks (the ones of the Layout), so a container
+  can always be added and the only containers that block another one are the ones
+  above it in its stack.
+- At every step the container of the store that gives the most value per action
+  (its value divided by the number of containers above it plus one) among the ones that
+  can be delivered on time is dug out: the containers above it are moved to another
+  stack of their size (or delivered or discarded if they can be) and then it is delivered.
+- The containers that arrive and the ones that are moved go to the lowest stack of their size,
+  or with placement 'deadline' to the one where they block the least (Engine.placement_cost).
+- If nothing can be delivered, the expired containers on the top of the stacks are
+  discarded and the containers whose delivery starts within the horizon are dug out in
+  advance. Otherwise the clock jumps to the next arrival or delivery start.
+
+After budget searches of the containers whose delivery starts soon, only the cheap steps are
+done. The budget is a number of searches and not a time, so the logs don't depend on the machine
+(and a run resumed from a checkpoint, that keeps the searches done, gives the same log).
+"""
+
+
+from store import *
+
+
+HORIZON = 50 # time units ahead in which the containers whose delivery starts are dug out in advance
+BUDGET = 1_000_000 # searches of the containers within the horizon (every one goes over the whole store)
+
+
+class Strategy(Engine):
+    """Implementation of the lookahead strategy."""
+
+    wide_layout = True #more stacks of a size leave fewer containers above the ones to deliver
+    _horizon: int
+    _budget: int
+
+
+    def __init__(self, width: int, log_path: str, layout: Optional[Layout] = None, horizon: int = HORIZON,
+                 budget: int = BUDGET, placement: str = 'layout', resume_offset: Optional[int] = None):
+        super().__init__(width, log_path, "LookaheadStrategy", layout, placement, resume_offset)
+        self._horizon = horizon
+        self._budget = budget
+
+
+    def stacks(self, size: int) -> List[Position]:
+        """Returns the positions of all the stacks of a size"""
+
+        return [q for p in self._layout.pairs(size) for q in (p, p + size)]
+
+
+    def depth(self, c: Container) -> int:
+        """Returns the number of containers above c in its stack"""
+
+        level, p = self._store.location(c)
+        return self._store.stack_height(p) - level - 1
+
+
+    def on_arrival(self, c: Container) -> Position:
+        """Returns the stack of the size of c where it is added"""
+
+        return self.best_stack(c, None)
+
+
+    def best_stack(self, c: Container, avoid: Optional[Position]) -> Position:
+        """Returns the stack of the size of c (that is not avoid) where it blocks the least (the lowest one with placement 'layout')"""
+
+        candidates = [q for q in self.stacks(c.size) if q != avoid]
+        if self._placement == 'deadline':
+            return self.best_position(c, candidates)
+        return min(candidates, key=self._store.stack_height)
+
+
+    def best_candidate(self, candidates: Iterable[Container], by_value: bool = False) -> Optional[Container]:
+        """
+        Returns the candidate with the most value per action that can be delivered on time
+        (by_value if the candidates come the most valuable first, so that the rest can be skipped)
+        """
+
+        best, best_score = None, 0.0
+        for c in candidates:
+            if by_value and c.value <= best_score: #the value per action of the rest is at most their value
+                break
+            depth = self.depth(c)
+            if self._time + depth < c.delivery.end:
+                score = c.value / (depth + 1)
+                if score > best_score:
+                    best, best_score = c, score
+        return best
+
+
+    def dig(self, c: Container) -> None:
+        """Does the next action to deliver c: delivers it, or frees the top container of its stack"""
+
+        p = self._store.location(c)[1]
+        top_c = self._store.top_container(p)
+        if top_c is c or self.deliverable(top_c):
+            self.remove_deliverable(top_c)
+        elif self.expired(top_c):
+            self.remove_expired(top_c)
+        else:
+            q = self.best_stack(top_c, p)
+            self._store.move(top_c, q)
+            self._log.move(self._time, top_c, q)
+        self.update_time()
+
+
+    def next_action(self, end: TimeStamp) -> None:
+        """Does the next action of the strategy (or moves the clock until something can be done)"""
+
+        deadlines = self._store.deadlines()
+        best = self.best_candidate(deadlines.deliverable(self._time), by_value=True)
+        if best is not None:
+            self.dig(best)
+            return
+
+        for p in self._layout.cycle(): #we discard the expired containers of the tops
+            top_c = self._store.top_container(p)
+            if top_c is not None and self.expired(top_c):
+                self.remove_expired(top_c)
+                self.update_time()
+                return
+
+        if self._searches < self._budget: #we dig out the containers that can be delivered soon
+            self._searches += 1
+            soon = [c for c in self._store.containers()
+                    if self._time < c.delivery.start <= self._time + self._horizon and self.depth(c) > 0]
+            best = self.best_candidate(soon)
+            if best is not None:
+                self.dig(best)
+                return
+
+        self._time = int(min(end, deadlines.next_opening(self._time)))
+
+
+def execute_strategy(containers_path: str, log_path: str, width: int, checkpoint_path: Optional[str] = None,
+                     resume: bool = False, horizon: int = HORIZON, budget: int = BUDGET, placement: str = 'layout'):
+    """
+    Execute the strategy on an empty store of a certain width reading containers from containers_path and logging to log_path.
+    With checkpoint_path the run writes checkpoints, and with resume it continues from the last one (see run_strategy).
+    With placement 'deadline' the containers go to the stacks where they block the least (see Strategy.best_stack).
+    """
+
+    layout = plan_layout(width, size_mix(containers_path), Strategy.wide_layout)
+    strategy = Strategy(width, log_path, layout, horizon, budget, placement, checkpoint_log_offset(checkpoint_path, resume))
+    run_strategy(strategy, containers_path, checkpoint_path, resume)
+
+
+# start main script when program executed
+if __name__ == '__main__':
+    strategy_main(execute_strategy)
@@ -0,0 +1,253 @@
+"""
+Several stores (yards) fed by one stream of arrivals:
+
+    python3 multistore.py containers.txt [--shards 3] [--width 20] [--strategy simple] [--router round_robin]
+                          [--logs logs] [--timeline cash.txt]
+
+Every container that arrives is sent by a routing policy (see ROUTERS) to one of the
+shards. Every shard is a strategy with its own store and log and runs in its own worker
+process: the main process only sends it batches of the containers routed to it and gets
+back its cash timeline at the end. The log of every shard is a normal log of the
+containers file (check_and_show and validate accept it) and the cash timelines of the
+shards are merged into the cash of all the yards over time.
+"""
+
+
+import argparse
+import heapq
+import importlib
+import multiprocessing
+import os
+import sys
+from queue import Empty, Full
+from typing import Callable, List, Optional, Protocol, Sequence, Tuple
+
+from store import *
+from validate import validate
+
+
+BATCH_SIZE = 256 # containers sent at once to a shard
+QUEUE_BATCHES = 16 # batches waiting for a shard before the routing waits for it
+POLL_SECONDS = 1.0 # how often the main process checks that the workers are alive while it waits for them
+
+
+class Router(Protocol):
+    """Routing policy: chooses the shard of every container that arrives."""
+
+    def route(self, c: Container) -> int:
+        """Returns the shard (0 to shards - 1) of the container c"""
+        ...
+
+
+class RoundRobin:
+    """Sends the containers to the shards one after the other."""
+
+    def __init__(self, shards: int):
+        self._shards = shards
+        self._next = 0
+
+    def route(self, c: Container) -> int:
+        shard = self._next
+        self._next = (self._next + 1) % self._shards
+        return shard
+
+
+class BySize:
+    """Sends all the containers of a size to the same shard."""
+
+    def __init__(self, shards: int):
+        self._shards = shards
+
+    def route(self, c: Container) -> int:
+        return (c.size - 1) % self._shards
+
+
+class ByValue:
+    """Sends every container to the shard with the least value routed to it (balances the value)."""
+
+    def __init__(self, shards: int):
+        self._heap = [(0, shard) for shard in range(shards)]
+
+    def route(self, c: Container) -> int:
+        value, shard = heapq.heappop(self._heap)
+        heapq.heappush(self._heap, (value + c.value, shard))
+        return shard
+
+
+ROUTERS = {'round_robin': RoundRobin, 'size': BySize, 'value': ByValue}
+
+Timeline = List[Tuple[TimeStamp, int]]  # (time, cash) every time the cash changes
+
+
+def shard_log_path(logs: str, name: str, shard: int) -> str:
+    """Returns the path of the log of a shard"""
+
+    return os.path.join(logs, f'{name}-{shard}.log')
+
+
+def run_shard(strategy: str, width: int, log_path: str, layout: Optional[Layout],
+              batches: Callable[[], Optional[List[Container]]]) -> Timeline:
+    """
+    Executes the strategy of the module strategy with the containers of the batches returned
+    by batches (until it returns None) and returns its cash timeline (the CASH lines of its log)
+    """
+
+    module = importlib.import_module(strategy)
+    engine = module.Strategy(width, log_path, layout)
+    for batch in iter(batches, None):
+        for c in batch:
+            engine.exec(c)
+    engine.close()
+
+    timeline = [(0, 0)]
+    with open(log_path, 'rb') as log:
+        for line in log:
+            if b' CASH ' in line:
+                t, what, cash = line.split()
+                timeline.append((int(t), int(cash)))
+    return timeline
+
+
+def shard_worker(shard: int, strategy: str, width: int, log_path: str, layout: Optional[Layout],
+                 arrivals: multiprocessing.Queue, results: multiprocessing.Queue) -> None:
+    """Worker process of a shard: puts (shard, timeline, error) in results when the arrivals end"""
+
+    try:
+        results.put((shard, run_shard(strategy, width, log_path, layout, arrivals.get), ''))
+    except Exception as error: #the main process must know that the shard has failed
+        for batch in iter(arrivals.get, None):
+            pass
+        results.put((shard, [], f'{type(error).__name__}: {error}'))
+
+
+def merge_timelines(timelines: Sequence[Timeline]) -> Timeline:
+    """Returns the cash of all the shards every time it changes"""
+
+    cash = [0] * len(timelines)
+    merged = [(0, 0)]
+    events = heapq.merge(*[[(t, shard, c) for t, c in timeline] for shard, timeline in enumerate(timelines)])
+    for t, shard, c in events:
+        cash[shard] = c
+        if merged[-1][0] == t:
+            merged[-1] = (t, sum(cash))
+        else:
+            merged.append((t, sum(cash)))
+    return merged
+
+
+def send(arrivals: multiprocessing.Queue, worker: multiprocessing.Process, batch: Optional[list]) -> None:
+    """Puts the batch in the arrivals of a worker (waiting while they are full) unless it has died"""
+
+    while True:
+        try:
+            arrivals.put(batch, timeout=POLL_SECONDS)
+            return
+        except Full:
+            if not worker.is_alive():
+                raise RuntimeError(f'the worker of a shard has died (exit code {worker.exitcode})')
+
+
+def run_multistore(containers_path: str, shards: int, width: int, strategy: str = 'simple',
+                   router: str = 'round_robin', logs: str = 'logs', processes: bool = True) -> List[Timeline]:
+    """
+    Routes the containers of containers_path to shards stores of the width run by the strategy
+    (in worker processes, or one after the other if not processes) and returns their cash timelines
+    """
+
+    assert shards > 0 and router in ROUTERS
+    policy = ROUTERS[router](shards)
+    layout = plan_layout(width, size_mix(containers_path), importlib.import_module(strategy).Strategy.wide_layout)
+    name = os.path.splitext(os.path.basename(containers_path))[0]
+    paths = [shard_log_path(logs, name, shard) for shard in range(shards)]
+
+    if not processes:
+        routed: List[list] = [[] for shard in range(shards)]
+        for c in iter_containers(containers_path):
+            routed[policy.route(c)].append(c)
+        return [run_shard(strategy, width, paths[shard], layout, iter([routed[shard], None]).__next__)
+                for shard in range(shards)]
+
+    context = multiprocessing.get_context()
+    results = context.Queue()
+    queues = [context.Queue(QUEUE_BATCHES) for shard in range(shards)]
+    workers = [context.Process(target=shard_worker, args=(shard, strategy, width, paths[shard], layout, queues[shard], results))
+               for shard in range(shards)]
+    for worker in workers:
+        worker.start()
+
+    try:
+        batches: List[list] = [[] for shard in range(shards)]
+        for c in iter_containers(containers_path):
+            shard = policy.route(c)
+            batches[shard].append(c)
+            if len(batches[shard]) == BATCH_SIZE:
+                send(queues[shard], workers[shard], batches[shard])
+                batches[shard] = []
+        for shard in range(shards):
+            if batches[shard]:
+                send(queues[shard], workers[shard], batches[shard])
+            send(queues[shard], workers[shard], None)
+
+        timelines: List[Timeline] = [[] for shard in range(shards)]
+        errors = []
+        pending = set(range(shards))
+        while pending:
+            try:
+                shard, timeline, error = results.get(timeout=POLL_SECONDS)
+            except Empty: #a worker that ends normally has put its result before
+                dead = [shard for shard in sorted(pending) if workers[shard].exitcode not in (None, 0)]
+                if dead:
+                    raise RuntimeError('; '.join(f'shard {shard}: the worker died (exit code {workers[shard].exitcode})'
+                                                 for shard in dead))
+                continue
+            pending.discard(shard)
+            timelines[shard] = timeline
+            if error:
+                errors.append(f'shard {shard}: {error}')
+    except BaseException: #the other workers would wait forever for their arrivals
+        for worker in workers:
+            worker.terminate()
+            worker.join()
+        raise
+    for worker in workers:
+        worker.join()
+    if errors:
+        raise RuntimeError('; '.join(errors))
+    return timelines
+
+
+def main():
+    """main script"""
+
+    parser = argparse.ArgumentParser(description='Runs a strategy on several stores fed by one stream of containers.')
+    parser.add_argument('containers')
+    parser.add_argument('--shards', type=int, default=3)
+    parser.add_argument('--width', type=int, default=20)
+    parser.add_argument('--strategy', default='simple', help='module with a Strategy class')
+    parser.add_argument('--router', default='round_robin', choices=sorted(ROUTERS))
+    parser.add_argument('--logs', default='logs', help='directory of the logs of the shards')
+    parser.add_argument('--timeline', help='file with the merged cash timeline (time cash per line)')
+    args = parser.parse_args()
+
+    os.makedirs(args.logs, exist_ok=True)
+    timelines = run_multistore(args.containers, args.shards, args.width, args.strategy, args.router, args.logs)
+    name = os.path.splitext(os.path.basename(args.containers))[0]
+    ok = True
+    for shard in range(args.shards):
+        log_path = shard_log_path(args.logs, name, shard)
+        result = validate(args.containers, log_path)
+        ok = ok and result.ok and result.cash == timelines[shard][-1][1]
+        print(f'{log_path}: ' + (f'OK, cash {result.cash}' if result.ok else f'line {result.error_line}: {result.error}'))
+
+    merged = merge_timelines(timelines)
+    print(f'total cash {merged[-1][1]}')
+    if args.timeline:
+        with open(args.timeline, 'w') as file:
+            file.write(''.join(f'{t} {cash}\n' for t, cash in merged))
+    if not ok:
+        sys.exit(1)
+
+
+# start main script when program executed
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""
+Opt-in profiling of the strategies:
+
+    python3 profiler.py strategy containers.txt log.txt width [--window 100] [--output profile.json]
+
+While a Profiler is active, the methods of Store, CompactStore, Logger, Engine and the
+Strategy classes are replaced (in the classes) by wrappers that count the calls and time
+them; when it stops, the original methods are put back, so nothing is paid when the
+profiler is not used. For every method the report gives the calls, the cumulative time
+(with the calls it does inside) and its own time (without the calls to other profiled
+methods), and the own times added by kind (store, log and strategy phases) tell where the
+time of a run goes. The actions (ADD, REMOVE and MOVE, not CASH) logged during every
+arrival (Engine.exec) are also kept to get a time series of actions per window of arrivals.
+"""
+
+
+import argparse
+import functools
+import importlib
+import json
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+from store import *
+
+
+STORE_METHODS = ['add', 'remove', 'move', 'can_add', 'can_remove', 'can_move', 'location', 'is_in_store',
+                 'top_container', 'stack_height', 'stack', 'height', 'empty', 'containers', 'removable_containers',
+                 'checkpoint', 'restore']
+LOGGER_METHODS = ['add', 'remove', 'move', 'cash', '_write_buffer', 'flush']
+STRATEGY_METHODS = ['exec', 'on_arrival', 'next_action', 'det_position', 'best_position', 'placement_cost',
+                    'add_container', 'remove_expired', 'remove_deliverable',
+                    'move_next_or_before', 'move_container_pila', 'empty_stack', 'cycle_pair', 'update_time',
+                    'best_candidate', 'best_stack', 'dig']
+LOGGED_ACTIONS = {'log.add', 'log.remove', 'log.move'} # the CASH lines are not actions on the store
+
+
+class Profiler:
+    """Counters and timers of the methods of the store, the logger and the strategy phases."""
+
+    calls: Counter
+    cumulative: Dict[str, float]
+    own: Dict[str, float]
+    actions_per_arrival: List[int]
+    _children: List[float]
+    _actions: int
+    _patched: List[Tuple[type, str, Callable]]
+
+
+    def __init__(self):
+        self.calls = Counter()
+        self.cumulative = {}
+        self.own = {}
+        self.actions_per_arrival = []
+        self._children = [] #time of the profiled calls done inside every profiled call that is running
+        self._actions = 0
+        self._patched = []
+
+
+    def _wrap(self, key: str, f: Callable) -> Callable:
+        """Returns f counting and timing its calls as key"""
+
+        children = self._children
+        arrival = key == 'strategy.exec'
+        action = key in LOGGED_ACTIONS
+
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            if action:
+                self._actions += 1
+            if arrival:
+                actions = self._actions
+            children.append(0.0)
+            start = time.perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                inside = children.pop()
+                self.calls[key] += 1
+                self.cumulative[key] = self.cumulative.get(key, 0.0) + elapsed
+                self.own[key] = self.own.get(key, 0.0) + elapsed - inside
+                if children:
+                    children[-1] += elapsed
+                if arrival:
+                    self.actions_per_arrival.append(self._actions - actions)
+
+        return wrapper
+
+
+    def patch(self, cls: type, names: Sequence[str], kind: str) -> None:
+        """Profiles the methods names defined in the class cls as kind.name"""
+
+        for name in names:
+            if name in cls.__dict__ and not any(c is cls and n == name for c, n, f in self._patched):
+                f = cls.__dict__[name]
+                self._patched.append((cls, name, f))
+                setattr(cls, name, self._wrap(f'{kind}.{name}', f))
+
+
+    def start(self, strategy_classes: Sequence[type] = ()) -> None:
+        """Starts profiling the stores, the loggers and the strategy classes (and Engine)"""
+
+        for cls in (Store, CompactStore):
+            self.patch(cls, STORE_METHODS, 'store')
+        self.patch(Logger, LOGGER_METHODS, 'log')
+        for cls in (Engine, *strategy_classes):
+            self.patch(cls, STRATEGY_METHODS, 'strategy')
+
+
+    def stop(self) -> None:
+        """Puts back the original methods"""
+
+        while self._patched:
+            cls, name, f = self._patched.pop()
+            setattr(cls, name, f)
+
+
+    @contextmanager
+    def active(self, strategy_classes: Sequence[type] = ()) -> Iterator['Profiler']:
+        """Context in which the profiler is started"""
+
+        self.start(strategy_classes)
+        try:
+            yield self
+        finally:
+            self.stop()
+
+
+    def kinds(self) -> Dict[str, float]:
+        """Returns the own time of all the methods of every kind (store, log and strategy)"""
+
+        totals: Dict[str, float] = {}
+        for key, seconds in self.own.items():
+            kind = key.split('.')[0]
+            totals[kind] = totals.get(kind, 0.0) + seconds
+        return totals
+
+
+    def series(self, window: int) -> List[Tuple[int, int, int]]:
+        """Returns the (first arrival, arrivals, actions) of every window of window arrivals"""
+
+        assert window > 0
+        return [(i, len(self.actions_per_arrival[i:i + window]), sum(self.actions_per_arrival[i:i + window]))
+                for i in range(0, len(self.actions_per_arrival), window)]
+
+
+    def report(self, window: int = 100, file=sys.stdout) -> None:
+        """Prints the calls and times of every method, the time of every kind and the series of actions"""
+
+        total = sum(self.own.values())
+        print(f"{'method':<32} {'calls':>10} {'cumulative':>11} {'own':>9} {'us/call':>9} {'own %':>6}", file=file)
+        for key in sorted(self.own, key=self.own.get, reverse=True):
+            own = self.own[key]
+            print(f'{key:<32} {self.calls[key]:>10} {self.cumulative[key]:>11.4f} {own:>9.4f} '
+                  f'{1e6 * self.cumulative[key] / self.calls[key]:>9.2f} {100 * own / total if total else 0:>6.1f}', file=file)
+        print(file=file)
+        for kind, seconds in sorted(self.kinds().items()):
+            print(f'{kind:<10} {seconds:>9.4f} s {100 * seconds / total if total else 0:>6.1f} %', file=file)
+        print(file=file)
+        print(f"{'arrivals':>17} {'actions':>9} {'per arrival':>12}", file=file)
+        for first, arrivals, actions in self.series(window):
+            print(f'{first:>8}-{first + arrivals - 1:<8} {actions:>9} {actions / arrivals:>12.2f}', file=file)
+
+
+    def as_dict(self, window: int = 100) -> dict:
+        """Returns the results as a dict that can be written as JSON"""
+
+        return {'methods': {key: {'calls': self.calls[key], 'cumulative': self.cumulative[key], 'own': self.own[key]}
+                            for key in self.own},
+                'kinds': self.kinds(),
+                'window': window,
+                'series': self.series(window)}
+
+
+def profile_strategy(strategy: str, containers_path: str, log_path: str, width: int) -> Profiler:
+    """Runs execute_strategy of the module strategy with a Profiler and returns it"""
+
+    module = importlib.import_module(strategy)
+    classes = [cls for cls in vars(module).values() if isinstance(cls, type) and issubclass(cls, Engine) and cls is not Engine]
+    profiler = Profiler()
+    with profiler.active(classes):
+        module.execute_strategy(containers_path, log_path, width)
+    return profiler
+
+
+def main():
+    """main script"""
+
+    parser = argparse.ArgumentParser(description='Profiles a strategy.')
+    parser.add_argument('strategy', help='module with execute_strategy')
+    parser.add_argument('containers')
+    parser.add_argument('log')
+    parser.add_argument('width', type=int)
+    parser.add_argument('--window', type=int, default=100, help='arrivals of every window of the series of actions')
+    parser.add_argument('--output', help='JSON file with the results')
+    args = parser.parse_args()
+
+    profiler = profile_strategy(args.strategy, args.containers, args.log, args.width)
+    profiler.report(args.window)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(profiler.as_dict(args.window), file, indent=1)
+
+
+# start main script when program executed
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+"""
+Batched replay of many logs of the same containers file with NumPy:
+
+    python3 replay.py containers.txt log1.txt log2.txt ...
+
+The stores of all the logs are replayed at the same time, one action of every log per
+step: the heights of the stacks of all the stores are kept in one array (a row for every
+log) and the location of every container in every store in another one, so that the
+checks of the actions (equal heights under an added container, a removed container on
+the top of all its stacks...) are array operations over all the logs at once. A container
+at level l is on the top of all its stacks exactly when they all have height l + 1.
+
+The results are the same as the ones of validate.validate (the error messages are shorter).
+"""
+
+
+import sys
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from store import *
+from validate import Validation, validate
+
+
+ADD, REMOVE, MOVE, CASH = 1, 2, 3, 4
+ERRORS = ['', 'time goes back', 'wrong cash', 'unknown container', 'container already in the store',
+          'container not in the store', 'container does not fit in the position',
+          'container cannot be added to the position', 'container cannot be removed',
+          'container cannot be moved to the position']
+TIME, WRONG_CASH, UNKNOWN, IN_STORE, NOT_IN_STORE, OUTSIDE, CANNOT_ADD, CANNOT_REMOVE, CANNOT_MOVE = range(1, 10)
+
+
+def read_log_array(log_path: str) -> Tuple[int, np.ndarray]:
+    """
+    Returns the width of the store of a text log and its actions as an array with a row
+    (time, action, identifier, position) for every line after START; the REMOVE rows are
+    (time, REMOVE, 0, identifier) and the CASH rows (time, CASH, 0, cash).
+    Raises ValueError if the log is not well formed.
+    """
+
+    with open(log_path, 'rb') as file:
+        tokens = file.readline().split()
+        if len(tokens) != 4 or tokens[0] != b'0' or tokens[1] != b'START':
+            raise ValueError('the log does not start with START')
+        data = file.read()
+
+    #the names of the actions are replaced by numbers so that all the lines have 4 numbers
+    data = data.replace(b'REMOVE', b'2 0').replace(b'CASH', b'4 0').replace(b'ADD', b'1').replace(b'MOVE', b'3')
+    actions = np.array(data.split(), dtype=np.int64)
+    if len(actions) % 4 != 0:
+        raise ValueError('wrong line')
+    actions = actions.reshape(-1, 4)
+    if not np.isin(actions[:, 1], (ADD, REMOVE, MOVE, CASH)).all():
+        raise ValueError('unknown action')
+    return int(tokens[3]), actions
+
+
+def replay_batch(containers_path: str, log_paths: Sequence[str]) -> List[Validation]:
+    """Checks that the actions of every log at log_paths with the containers at containers_path are legal"""
+
+    manifest = read_manifest(containers_path)
+    identifiers = np.array(manifest.identifier, dtype=np.int64)
+    order = np.argsort(identifiers)
+    sorted_identifiers = identifiers[order]
+    size = np.array(manifest.size, dtype=np.int64)
+    value = np.array(manifest.value, dtype=np.int64)
+    delivery_start = np.array(manifest.delivery_start, dtype=np.int64)
+    delivery_end = np.array(manifest.delivery_end, dtype=np.int64)
+    shift = np.arange(max(size, default=1))  # columns that a container takes up from its position
+
+    def index_of(identifier: np.ndarray) -> np.ndarray:
+        """Returns the index in the manifest of the identifiers (-1 for the unknown ones)"""
+
+        i = np.minimum(np.searchsorted(sorted_identifiers, identifier), len(order) - 1)
+        return np.where(sorted_identifiers[i] == identifier, order[i], -1) if len(order) else -np.ones_like(identifier)
+
+    results: List[Validation] = [Validation(False, 0, 0)] * len(log_paths)
+    widths, logs, batch = [], [], []
+    for b, log_path in enumerate(log_paths):
+        try:
+            width, actions = read_log_array(log_path)
+        except ValueError: #the streaming validator finds the line of the error
+            results[b] = validate(containers_path, log_path)
+            continue
+        widths.append(width)
+        logs.append(actions)
+        batch.append(b)
+    if not logs:
+        return results
+
+    n = len(logs)
+    lengths = np.array([len(actions) for actions in logs])
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    actions = np.concatenate(logs)
+    width = np.array(widths)
+    max_width = max(width.max(), 1)
+    heights = np.zeros((n, max_width), dtype=np.int64)
+    location = -np.ones((n, len(identifiers)), dtype=np.int64)  # position of every container in every store
+    level = np.zeros((n, len(identifiers)), dtype=np.int64)
+    cash = np.zeros(n, dtype=np.int64)
+    last = np.zeros(n, dtype=np.int64)
+    error = np.zeros(n, dtype=np.int64)  # ERRORS index of every store
+    error_line = np.zeros(n, dtype=np.int64)
+
+    def columns(p: np.ndarray, j: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the (clipped) columns that the containers j take up from positions p and which ones are real"""
+
+        cols = p[:, None] + shift[None, :]
+        return np.clip(cols, 0, max_width - 1), shift[None, :] < size[j][:, None]
+
+    def fits(b: np.ndarray, p: np.ndarray, j: np.ndarray) -> np.ndarray:
+        """Returns if the containers j can be added to the positions p of the stores b (and the heights there)"""
+
+        cols, real = columns(p, j)
+        h = heights[b[:, None], cols]
+        return ((h == h[:, :1]) | ~real).all(axis=1), h[:, 0]
+
+    def on_top(b: np.ndarray, j: np.ndarray) -> np.ndarray:
+        """Returns if the containers j (in the stores b) are on the top of all their stacks"""
+
+        cols, real = columns(location[b, j], j)
+        return ((heights[b[:, None], cols] == level[b, j][:, None] + 1) | ~real).all(axis=1)
+
+    def set_heights(b: np.ndarray, p: np.ndarray, j: np.ndarray, h: np.ndarray) -> None:
+        """Sets the height of the columns that the containers j take up from positions p of the stores b to h"""
+
+        cols, real = columns(p, j)
+        heights[np.broadcast_to(b[:, None], cols.shape)[real], cols[real]] = np.broadcast_to(h[:, None], cols.shape)[real]
+
+    def fail(b: np.ndarray, bad: np.ndarray, code: int, k: int) -> np.ndarray:
+        """Marks the error code in the stores b where bad (if they had no error) and returns the good ones"""
+
+        new = bad & (error[b] == 0)
+        error[b[new]] = code
+        error_line[b[new]] = k + 2  # the first line of the log is START
+        return ~bad
+
+    for k in range(lengths.max()):
+        b = np.nonzero((error == 0) & (k < lengths))[0]
+        rows = actions[offsets[b] + k]
+        t, what = rows[:, 0], rows[:, 1]
+        good = fail(b, t < last[b], TIME, k)
+        b, rows, t, what = b[good], rows[good], t[good], what[good]
+        last[b] = t
+
+        m = what == CASH
+        fail(b[m], rows[m, 3] != cash[b[m]], WRONG_CASH, k)
+
+        m = what == ADD
+        bm, j, p = b[m], index_of(rows[m, 2]), rows[m, 3]
+        good = fail(bm, j < 0, UNKNOWN, k)
+        bm, j, p = bm[good], j[good], p[good]
+        good = fail(bm, (p < 0) | (p + size[j] > width[bm]), OUTSIDE, k)
+        good &= fail(bm, (location[bm, j] >= 0) & good, IN_STORE, k)
+        ok, h = fits(bm, p, j)
+        good &= fail(bm, ~ok & good, CANNOT_ADD, k)
+        bm, j, p, h = bm[good], j[good], p[good], h[good]
+        set_heights(bm, p, j, h + 1)
+        location[bm, j], level[bm, j] = p, h
+
+        m = what == REMOVE
+        bm, j, t_m = b[m], index_of(rows[m, 3]), t[m]
+        good = fail(bm, j < 0, UNKNOWN, k)
+        bm, j, t_m = bm[good], j[good], t_m[good]
+        good = fail(bm, location[bm, j] < 0, NOT_IN_STORE, k)
+        bm, j, t_m = bm[good], j[good], t_m[good]
+        good = fail(bm, ~on_top(bm, j), CANNOT_REMOVE, k)
+        bm, j, t_m = bm[good], j[good], t_m[good]
+        set_heights(bm, location[bm, j], j, level[bm, j])
+        location[bm, j] = -1
+        delivered = (delivery_start[j] <= t_m) & (t_m < delivery_end[j])
+        np.add.at(cash, bm[delivered], value[j[delivered]])
+
+        m = what == MOVE
+        bm, j, p = b[m], index_of(rows[m, 2]), rows[m, 3]
+        good = fail(bm, j < 0, UNKNOWN, k)
+        bm, j, p = bm[good], j[good], p[good]
+        good = fail(bm, (p < 0) | (p + size[j] > width[bm]), OUTSIDE, k)
+        bm, j, p = bm[good], j[good], p[good]
+        good = fail(bm, location[bm, j] < 0, NOT_IN_STORE, k)
+        bm, j, p = bm[good], j[good], p[good]
+        ok, h = fits(bm, p, j)
+        good = fail(bm, ~(on_top(bm, j) & ok), CANNOT_MOVE, k)
+        bm, j, p = bm[good], j[good], p[good]
+        set_heights(bm, location[bm, j], j, level[bm, j]) #the container is removed
+        ok, h = fits(bm, p, j)
+        good = fail(bm, ~ok, CANNOT_MOVE, k) #it was under itself
+        bm, j, p, h = bm[good], j[good], p[good], h[good]
+        set_heights(bm, p, j, h + 1)
+        location[bm, j], level[bm, j] = p, h
+
+    for i, b in enumerate(batch):
+        if error[i]:
+            results[b] = Validation(False, int(cash[i]), int(error_line[i]), int(error_line[i]), ERRORS[error[i]])
+        else:
+            results[b] = Validation(True, int(cash[i]), int(lengths[i]) + 1)
+    return results
+
+
+def main():
+    """main script"""
+
+    if len(sys.argv) < 3:
+        print('usage: python3 replay.py containers_file log_file...', file=sys.stderr)
+        sys.exit(2)
+
+    results = replay_batch(sys.argv[1], sys.argv[2:])
+    for log_path, result in zip(sys.argv[2:], results):
+        if result.ok:
+            print(f'{log_path}: OK, cash {result.cash}')
+        else:
+            print(f'{log_path}: line {result.error_line}: {result.error} (cash {result.cash})')
+    if not all(result.ok for result in results):
+        sys.exit(1)
+
+
+# start main script when program executed
+if __name__ == '__main__':
+    main()
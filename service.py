@@ -0,0 +1,355 @@
+"""
+Streaming service: runs a strategy with the containers of a live feed as they arrive.
+
+    python3 service.py serve strategy log.txt width [--port 5000] [--subscribe-port 5001] [--queue 1024] [--feeds 1]
+    python3 service.py replay containers.txt [--port 5000] [--speed 100]
+    python3 service.py subscribe [--port 5001] [--topic log|metrics]
+
+serve reads container records (the lines of a containers file) from stdin, or from the
+producers that connect to the local port, and executes the strategy (Engine.exec) with
+every container that arrives. The records wait in a bounded queue: when it is full the
+feeds are not read, so the producers are slowed down (backpressure). The clients of the
+subscribe port choose a topic with their first line and get the lines of the log as they
+are written ('log') or a JSON line with the cash, the height... after every arrival ('metrics').
+The records of containers that cannot be placed (a size without stacks, an identifier
+that is already in the store) are rejected. The service stops when the feeds end, or
+with an error if the strategy fails.
+
+replay sends the containers of a file to the port (or to stdout) at speed time units per
+second (as fast as possible with speed 0), so that the service can be tried without a feed:
+
+    python3 service.py replay fitxer.txt --speed 0 | python3 service.py serve simple log.txt 20
+"""
+
+
+import argparse
+import asyncio
+import importlib
+import json
+import sys
+from typing import AsyncIterator, Dict, Optional, Set
+
+from store import *
+
+
+QUEUE_SIZE = 1024 # containers that can wait for the strategy
+SUBSCRIBER_QUEUE_SIZE = 1 << 16 # lines that can wait for a subscriber before it is disconnected
+HOST = '127.0.0.1'
+
+
+def parse_container(line: bytes) -> Container:
+    """Returns the container of a line of a containers file"""
+
+    fields = list(map(int, line.split()))
+    if len(fields) != 7:
+        raise ValueError('a container record has 7 fields')
+    identifier, size, value, arrival_start, arrival_end, delivery_start, delivery_end = fields
+    return Container(identifier, size, value, TimeRange(arrival_start, arrival_end), TimeRange(delivery_start, delivery_end))
+
+
+def container_line(c: Container) -> str:
+    """Returns the line of the container c in a containers file"""
+
+    return f'{c.identifier}\t{c.size}\t{c.value}\t{c.arrival.start}\t{c.arrival.end}\t{c.delivery.start}\t{c.delivery.end}\n'
+
+
+class Hub:
+    """Subscribers of the topics of the service: every one gets the lines published in its topic."""
+
+    _subscribers: Dict[str, Set[asyncio.Queue]]
+
+    def __init__(self):
+        self._subscribers = {'log': set(), 'metrics': set()}
+
+
+    def subscribe(self, topic: str) -> asyncio.Queue:
+        """Returns the queue of the lines of the topic for a new subscriber (None when they end)"""
+
+        queue: asyncio.Queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers[topic].add(queue)
+        return queue
+
+
+    def publish(self, topic: str, line: str) -> None:
+        """Sends the line to the subscribers of the topic (the ones that don't keep up are dropped)"""
+
+        for queue in list(self._subscribers[topic]):
+            try:
+                queue.put_nowait(line)
+            except asyncio.QueueFull:
+                self._drop(topic, queue)
+
+
+    def _drop(self, topic: str, queue: asyncio.Queue) -> None:
+        """Ends the subscription of a queue to the topic"""
+
+        self._subscribers[topic].discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+
+    def close(self) -> None:
+        """Ends all the subscriptions"""
+
+        for topic, queues in self._subscribers.items():
+            for queue in list(queues):
+                self._drop(topic, queue)
+
+
+    async def serve_subscriber(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Sends to a client the lines of the topic of its first line"""
+
+        queue = None
+        try:
+            topic = (await reader.readline()).decode().strip() or 'log'
+            if topic not in self._subscribers:
+                writer.write(f'unknown topic {topic}\n'.encode())
+            else:
+                queue = self.subscribe(topic)
+                while (line := await queue.get()) is not None:
+                    writer.write(line.encode())
+                    await writer.drain()
+        except ConnectionError: #the client has disconnected (reset or broken pipe)
+            if queue is not None:
+                self._drop(topic, queue)
+        finally:
+            writer.close()
+
+
+class StreamingLogger(Logger):
+    """Logger that also publishes every line of the log in the topic 'log' of a Hub."""
+
+    _hub: Hub
+
+    def __init__(self, path: str, name: str, width: int, hub: Hub):
+        self._hub = hub #the START line is written by Logger.__init__
+        super().__init__(path, name, width, LOG_BUFFER)
+
+    def _write_line(self, line: str):
+        super()._write_line(line)
+        self._hub.publish('log', line)
+
+
+def streaming_strategy(module, hub: Hub) -> type:
+    """Returns the Strategy of the module with a StreamingLogger of the hub"""
+
+    class Strategy(module.Strategy):
+        def make_logger(self, log_path: str, name: str, width: int, resume_offset: Optional[int] = None) -> Logger:
+            assert resume_offset is None #the service doesn't resume
+            return StreamingLogger(log_path, name, width, hub)
+
+    return Strategy
+
+
+class Service:
+    """Feeds the containers that arrive to an engine through a bounded queue."""
+
+    _engine: Engine
+    _hub: Hub
+    _queue: asyncio.Queue
+    arrivals: int
+    rejected: int
+
+    def __init__(self, engine: Engine, hub: Hub, queue_size: int = QUEUE_SIZE):
+        self._engine = engine
+        self._hub = hub
+        self._queue = asyncio.Queue(queue_size)
+        self.arrivals = 0
+        self.rejected = 0
+
+
+    def _reject(self, record, error) -> None:
+        """Counts a record that is not executed"""
+
+        self.rejected += 1
+        print(f'rejected record {record!r}: {error}', file=sys.stderr)
+
+
+    def check(self, c: Container) -> None:
+        """Raises ValueError if the container c cannot be placed in the store of the engine"""
+
+        if c.size not in self._engine.layout().sizes():
+            raise ValueError(f'there are no stacks of size {c.size}')
+
+
+    async def feed(self, lines: AsyncIterator[bytes]) -> None:
+        """Puts the containers of the lines in the queue (waiting while it is full)"""
+
+        async for line in lines:
+            if not line.strip():
+                continue
+            try:
+                c = parse_container(line)
+                self.check(c)
+            except ValueError as error: #a wrong record doesn't stop the service
+                self._reject(line, error)
+                continue
+            await self._queue.put(c)
+
+
+    async def stop(self) -> None:
+        """Makes run end after the containers that are in the queue"""
+
+        await self._queue.put(None)
+
+
+    def metrics(self) -> dict:
+        """Returns the metrics of the service at that moment"""
+
+        store = self._engine.store()
+        return {'arrivals': self.arrivals, 'time': self._engine.time(), 'cash': self._engine.cash(),
+                'height': store.height(), 'containers': store.num_containers(),
+                'queued': self._queue.qsize(), 'rejected': self.rejected}
+
+
+    async def run(self) -> None:
+        """
+        Executes the strategy with the containers of the queue until stop and closes the log.
+        An exception of the strategy stops the service, because the engine may be half updated.
+        """
+
+        try:
+            while (c := await self._queue.get()) is not None:
+                if self._engine.store().is_in_store(c): #only known when the ones before it are executed
+                    self._reject(container_line(c), f'container {c.identifier} is already in the store')
+                    continue
+                self._engine.exec(c)
+                self.arrivals += 1
+                self._hub.publish('metrics', json.dumps(self.metrics()) + '\n')
+                await asyncio.sleep(0) #the feeds and the subscribers can go on between the arrivals
+        finally:
+            self._engine.close()
+            self._hub.close()
+
+
+async def stdin_lines() -> AsyncIterator[bytes]:
+    """Yields the lines of stdin (read in a thread, so it can be a pipe or a file)"""
+
+    loop = asyncio.get_running_loop()
+    while line := await loop.run_in_executor(None, sys.stdin.buffer.readline):
+        yield line
+
+
+async def serve(strategy: str, log_path: str, width: int, port: Optional[int] = None,
+                subscribe_port: Optional[int] = None, queue_size: int = QUEUE_SIZE, feeds: int = 1) -> Service:
+    """
+    Runs the strategy of the module strategy with the containers of stdin (or of the first
+    feeds producers that connect to port) until they end and returns the service
+    """
+
+    hub = Hub()
+    engine = streaming_strategy(importlib.import_module(strategy), hub)(width, log_path)
+    service = Service(engine, hub, queue_size)
+    runner = asyncio.create_task(service.run())
+    subscribers = await asyncio.start_server(hub.serve_subscriber, HOST, subscribe_port) if subscribe_port else None
+
+    async def feeding() -> None:
+        if port is None:
+            await service.feed(stdin_lines())
+            return
+        finished = asyncio.Semaphore(0)
+
+        async def on_feed(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            await service.feed(reader)
+            writer.close()
+            finished.release()
+
+        server = await asyncio.start_server(on_feed, HOST, port)
+        try:
+            for i in range(feeds):
+                await finished.acquire()
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    feeder = asyncio.create_task(feeding())
+    await asyncio.wait([feeder, runner], return_when=asyncio.FIRST_COMPLETED)
+    if runner.done(): #the strategy has failed: nobody would take the containers of the queue
+        feeder.cancel()
+        try:
+            await feeder
+        except asyncio.CancelledError:
+            pass
+        if subscribers is not None:
+            subscribers.close()
+        runner.result()
+        raise RuntimeError('the strategy stopped before the feeds ended')
+    await feeder
+    await service.stop()
+    await runner
+    if subscribers is not None:
+        subscribers.close()
+        await subscribers.wait_closed()
+    return service
+
+
+async def replay(containers_path: str, port: Optional[int] = None, speed: float = 100) -> None:
+    """Sends the containers of containers_path to port (or stdout) when they arrive, at speed time units per second"""
+
+    loop = asyncio.get_running_loop()
+    if port is None:
+        writer = None
+    else:
+        reader, writer = await asyncio.open_connection(HOST, port)
+    start = loop.time()
+    for c in iter_containers(containers_path):
+        if speed > 0:
+            delay = start + c.arrival.start / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        if writer is None:
+            sys.stdout.write(container_line(c))
+            sys.stdout.flush()
+        else:
+            writer.write(container_line(c).encode())
+            await writer.drain() #waits while the service doesn't read
+    if writer is not None:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def subscribe(port: int, topic: str) -> None:
+    """Prints the lines of the topic of the service"""
+
+    reader, writer = await asyncio.open_connection(HOST, port)
+    writer.write(f'{topic}\n'.encode())
+    async for line in reader:
+        sys.stdout.write(line.decode())
+    writer.close()
+
+
+def main():
+    """main script"""
+
+    parser = argparse.ArgumentParser(description='Streaming service of the strategies.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    command = commands.add_parser('serve', help='runs a strategy with the containers of a feed')
+    command.add_argument('strategy', help='module with a Strategy class')
+    command.add_argument('log')
+    command.add_argument('width', type=int)
+    command.add_argument('--port', type=int, help='port of the feeds (stdin by default)')
+    command.add_argument('--subscribe-port', type=int, help='port of the subscribers of the log and the metrics')
+    command.add_argument('--queue', type=int, default=QUEUE_SIZE, help='containers that can wait for the strategy')
+    command.add_argument('--feeds', type=int, default=1, help='feeds that connect to the port before the service stops')
+    command = commands.add_parser('replay', help='sends the containers of a file when they arrive')
+    command.add_argument('containers')
+    command.add_argument('--port', type=int, help='port of the service (stdout by default)')
+    command.add_argument('--speed', type=float, default=100, help='time units per second (0: as fast as possible)')
+    command = commands.add_parser('subscribe', help='prints the log or the metrics of the service')
+    command.add_argument('--port', type=int, required=True)
+    command.add_argument('--topic', default='log', choices=['log', 'metrics'])
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        service = asyncio.run(serve(args.strategy, args.log, args.width, args.port, args.subscribe_port, args.queue, args.feeds))
+        print(json.dumps(service.metrics()), file=sys.stderr)
+    elif args.command == 'replay':
+        asyncio.run(replay(args.containers, args.port, args.speed))
+    else:
+        asyncio.run(subscribe(args.port, args.topic))
+
+
+# start main script when program executed
+if __name__ == '__main__':
+    main()
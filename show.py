@@ -0,0 +1,34 @@
+"""
+Shows the replay of a log with curses:
+
+    python3 show.py containers.txt log.txt [--from T] [--fps N] [--speed N]
+
+--from T starts showing the store at time T (the actions before are only checked),
+--fps is the maximum number of frames per second and --speed the number of actions per second
+(0, the default, replays the actions as fast as they can be checked, drawing fps frames per second).
+"""
+
+
+import argparse
+import curses
+
+from store import *
+
+
+def main(stdscr: curses.window, args: argparse.Namespace):
+    """main script"""
+
+    init_curses()
+    check_and_show(args.containers, args.log, stdscr, args.fps, args.speed, args.start_time)
+    stdscr.getch() #we wait for a key to see the last state
+
+
+# start main script when program executed
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replays a log of a strategy.')
+    parser.add_argument('containers')
+    parser.add_argument('log')
+    parser.add_argument('--from', dest='start_time', type=int, default=0, help='first time shown')
+    parser.add_argument('--fps', type=float, default=30, help='maximum frames per second')
+    parser.add_argument('--speed', type=float, default=0, help='actions per second (0: unlimited)')
+    curses.wrapper(main, parser.parse_args())
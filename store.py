@@ -2,10 +2,22 @@
 Template file for store.py module.
 """
 
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
 from dataclasses import dataclass
 from turtle import width
-from typing import Optional, TextIO, List, Tuple
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional, Sequence, List, Tuple
+import bisect
 import curses
+import heapq
+import itertools
+import math
+import mmap
+import os
+import struct
+import sys
 import time
 
 
@@ -19,13 +31,13 @@ Location = Tuple[int, int]
 # a la Tuple  hi va primer l'eix Y (altura - fila) i despres l'eix X (pila - columna)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TimeRange:
     start: TimeStamp
     end: TimeStamp
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Container:
     identifier: int
     size: int
@@ -34,21 +46,408 @@ class Container:
     delivery: TimeRange
 
 
+class Manifest:
+    """
+    Containers of a file kept by columns: one array for every field of the containers,
+    so that the i-th container of the file is identifier[i], size[i], value[i], ...
+    Strategies can read the fields of a container by index without creating a Container
+    for each one of them.
+    """
+    identifier: array
+    size: array
+    value: array
+    arrival_start: array
+    arrival_end: array
+    delivery_start: array
+    delivery_end: array
+
+
+    def __init__(self, fields: Sequence[int] = ()):
+        """Creates a manifest from a flat list with the 7 fields of every container, one container after the other"""
+
+        assert len(fields) % 7 == 0
+        self.identifier = array('q', fields[0::7])
+        self.size = array('q', fields[1::7])
+        self.value = array('q', fields[2::7])
+        self.arrival_start = array('q', fields[3::7])
+        self.arrival_end = array('q', fields[4::7])
+        self.delivery_start = array('q', fields[5::7])
+        self.delivery_end = array('q', fields[6::7])
+
+
+    def __len__(self) -> int:
+        """Returns the number of containers of the manifest"""
+
+        return len(self.identifier)
+
+
+    def container(self, i: int) -> Container:
+        """Returns the i-th container of the manifest"""
+
+        return Container(self.identifier[i], self.size[i], self.value[i],
+                         TimeRange(self.arrival_start[i], self.arrival_end[i]),
+                         TimeRange(self.delivery_start[i], self.delivery_end[i]))
+
+
+    def __iter__(self) -> Iterator[Container]:
+        """Iterates over the containers of the manifest creating them one at a time"""
+
+        for i in range(len(self)):
+            yield self.container(i)
+
+
+def heap_ordered(heap: list) -> Iterator[tuple]:
+    """
+    Yields the entries of a heap from the smallest one without changing it, in O(log k) per entry
+    for the first k entries (the heap must not change while they are yielded)
+    """
+
+    frontier = [(heap[0], 0)] if heap else []
+    while frontier:
+        entry, i = heapq.heappop(frontier)
+        yield entry
+        for child in (2 * i + 1, 2 * i + 2):
+            if child < len(heap):
+                heapq.heappush(frontier, (heap[child], child))
+
+
+COMPACT_SLACK = 64 # dead entries that the heaps of a DeadlineIndex keep before they are rebuilt
+
+
+class DeadlineIndex:
+    """
+    Index of the delivery windows of the containers of a store, kept up to date by the store.
+    Tells which containers can be delivered at a time (the most valuable first), which one
+    expires the soonest and when the delivery of the next one starts.
+    The times asked must not go back (as the time of the strategies).
+    The containers that leave the store are removed lazily from the heaps, and the heaps are
+    rebuilt when most of their entries are of containers that have left.
+    """
+
+    _live: dict
+    _tickets: int
+    _serials: int
+    _pending: list
+    _open: list
+    _ends: list
+
+    def __init__(self):
+        self._live = {}     # identifier -> (ticket, serial) of the entries of the containers in the store
+        self._tickets = 0   # the ticket of a container orders it among the ones with the same key
+        self._serials = 0   # every time a container is added its entries get a new serial (its old entries are dead)
+        self._pending = []  # heap of (delivery start, ticket, serial, container) of the containers that cannot be delivered yet
+        self._open = []     # heap of (-value, ticket, serial, container) of the containers whose delivery has started
+        self._ends = []     # heap of (delivery end, ticket, serial, container)
+
+
+    def add(self, c: Container, ticket: Optional[int] = None) -> None:
+        """
+        Adds the container c, that has been added to the store (with the ticket it had before or
+        in another index if given, to restore it with the same order between the containers)
+        """
+
+        self._tickets = self._tickets + 1 if ticket is None else max(self._tickets, ticket)
+        ticket = self._tickets if ticket is None else ticket
+        self._serials += 1
+        self._live[c.identifier] = (ticket, self._serials)
+        heapq.heappush(self._pending, (c.delivery.start, ticket, self._serials, c))
+        heapq.heappush(self._ends, (c.delivery.end, ticket, self._serials, c))
+        if len(self._pending) + len(self._open) + len(self._ends) > 4 * len(self._live) + COMPACT_SLACK:
+            self._compact() #every live container has 2 entries, so at least half of them are dead
+
+
+    def _compact(self) -> None:
+        """Removes from the heaps the entries of the containers that are no longer in the store"""
+
+        for heap in (self._pending, self._open, self._ends):
+            heap[:] = [entry for entry in heap if self._is_live(entry)]
+            heapq.heapify(heap)
+
+
+    def ticket(self, c: Container) -> int:
+        """Returns the ticket of the container c (the later it was added, the higher)"""
+
+        return self._live[c.identifier][0]
+
+
+    def discard(self, c: Container) -> None:
+        """Removes the container c, that has been removed from the store"""
+
+        del self._live[c.identifier]
+
+
+    def _is_live(self, entry: tuple) -> bool:
+        """Returns if the entry of a heap is of a container that is (still) in the store"""
+
+        live = self._live.get(entry[3].identifier)
+        return live is not None and live[1] == entry[2]
+
+
+    def _clean(self, heap: list) -> None:
+        """Removes from the top of the heap the containers that are no longer in the store"""
+
+        while heap and not self._is_live(heap[0]):
+            heapq.heappop(heap)
+
+
+    def _advance(self, t: TimeStamp) -> None:
+        """Moves the containers whose delivery has started at time t from _pending to _open"""
+
+        while self._pending and self._pending[0][0] <= t:
+            entry = heapq.heappop(self._pending)
+            if self._is_live(entry):
+                heapq.heappush(self._open, (-entry[3].value, entry[1], entry[2], entry[3]))
+
+
+    def best_deliverable(self, t: TimeStamp) -> Optional[Container]:
+        """Returns the most valuable container that can be delivered at time t (None if there is none)"""
+
+        self._advance(t)
+        while self._open and (not self._is_live(self._open[0]) or self._open[0][3].delivery.end <= t):
+            heapq.heappop(self._open) #removed or expired (the expired ones are still in _ends)
+        return self._open[0][3] if self._open else None
+
+
+    def deliverable(self, t: TimeStamp) -> Iterator[Container]:
+        """
+        Yields the containers that can be delivered at time t, the most valuable first (lazily,
+        so the ones that are not asked for are not looked at). The store must not change meanwhile.
+        """
+
+        self.best_deliverable(t)
+        for entry in heap_ordered(self._open):
+            if self._is_live(entry) and entry[3].delivery.end > t:
+                yield entry[3]
+
+
+    def soonest_expiring(self) -> Optional[Container]:
+        """Returns the container of the store whose delivery ends the soonest (None if the store is empty)"""
+
+        self._clean(self._ends)
+        return self._ends[0][3] if self._ends else None
+
+
+    def expired(self, t: TimeStamp) -> Iterator[Container]:
+        """
+        Yields the containers of the store that are expired at time t, the oldest first (only the
+        entries of the heap up to t are looked at). The store must not change meanwhile.
+        """
+
+        self._clean(self._ends)
+        for entry in heap_ordered(self._ends):
+            if entry[0] > t:
+                break
+            if self._is_live(entry):
+                yield entry[3]
+
+
+    def next_opening(self, t: TimeStamp) -> float:
+        """Returns the first time after t at which the delivery of a container of the store starts (infinity if none)"""
+
+        self._advance(t)
+        self._clean(self._pending)
+        return self._pending[0][0] if self._pending else math.inf
+
+
+class FreeSpaceIndex:
+    """
+    Index of the runs of adjacent stacks of the same height of a store, kept up to date by the store.
+    A container of size k fits at p when the stacks p, ..., p + k - 1 are in the same run, so the
+    positions where it fits, the lowest of them and the one at a height are found with bisect
+    in the runs of every height sorted by (length, start) instead of comparing stack heights.
+    """
+
+    _starts: list
+    _runs: dict
+    _buckets: dict
+    _levels: list
+
+    def __init__(self, width: int):
+        self._starts = []   # sorted starts of the runs
+        self._runs = {}     # start -> (length, height) of every run
+        self._buckets = {}  # height -> sorted list of (length, start) of the runs of that height
+        self._levels = []   # sorted heights with runs
+        if width > 0:
+            self._insert(0, width, 0)
+
+
+    def _insert(self, start: int, length: int, height: int) -> None:
+        """Adds the run of length stacks of the height from start"""
+
+        bisect.insort(self._starts, start)
+        self._runs[start] = (length, height)
+        if height not in self._buckets:
+            self._buckets[height] = []
+            bisect.insort(self._levels, height)
+        bisect.insort(self._buckets[height], (length, start))
+
+
+    def _delete(self, start: int) -> Tuple[int, int]:
+        """Removes the run that starts at start and returns its (length, height)"""
+
+        length, height = self._runs.pop(start)
+        del self._starts[bisect.bisect_left(self._starts, start)]
+        bucket = self._buckets[height]
+        del bucket[bisect.bisect_left(bucket, (length, start))]
+        if not bucket:
+            del self._buckets[height]
+            del self._levels[bisect.bisect_left(self._levels, height)]
+        return length, height
+
+
+    def run_at(self, p: Position) -> Tuple[int, int, int]:
+        """Returns the (start, length, height) of the run of the stack p"""
+
+        start = self._starts[bisect.bisect_right(self._starts, p) - 1]
+        length, height = self._runs[start]
+        return start, length, height
+
+
+    def set_height(self, p: Position, size: int, height: int) -> None:
+        """
+        Changes to height the stacks p, ..., p + size - 1, that must be in the same run
+        (the stacks of a container that is added or removed)
+        """
+
+        start, length, old = self.run_at(p)
+        assert p + size <= start + length
+        end = start + length
+        self._delete(start)
+        if start < p:
+            self._insert(start, p - start, old)
+        if p + size < end:
+            self._insert(p + size, end - p - size, old)
+
+        first, last = p, p + size #the new run is joined to its neighbours of the same height
+        if first > 0:
+            left, left_length, left_height = self.run_at(first - 1)
+            if left_height == height:
+                self._delete(left)
+                first = left
+        if last in self._runs and self._runs[last][1] == height:
+            last += self._delete(last)[0]
+        self._insert(first, last - first, height)
+
+
+    def positions(self, size: int) -> List[Position]:
+        """Returns all the positions where a container of the size fits, from left to right"""
+
+        result = []
+        for height in self._levels:
+            bucket = self._buckets[height]
+            for length, start in bucket[bisect.bisect_left(bucket, (size, -1)):]:
+                result.extend(range(start, start + length - size + 1))
+        result.sort()
+        return result
+
+
+    def at_height(self, size: int, height: int) -> Optional[Position]:
+        """
+        Returns a position where a container of the size fits at the height (the first one
+        of the shortest run where it fits, so that the long runs are kept), or None if there is none
+        """
+
+        bucket = self._buckets.get(height)
+        if bucket is None or bucket[-1][0] < size:
+            return None
+        return bucket[bisect.bisect_left(bucket, (size, -1))][1]
+
+
+    def lowest(self, size: int) -> Optional[Position]:
+        """Returns a position where a container of the size fits at the lowest height (as at_height)"""
+
+        for height in self._levels:
+            if self._buckets[height][-1][0] >= size:
+                return self.at_height(size, height)
+        return None
+
+
+MASK64 = (1 << 64) - 1
+
+
+def zobrist_key(identifier: int, p: Position, level: int) -> int:
+    """
+    Returns the (pseudo random, 64 bits) key of the container identifier at the level of the stack p.
+    The hash of a store is the xor of the keys of its containers (splitmix64 of the three numbers).
+    """
+
+    x = (identifier * 0x9E3779B97F4A7C15 + p * 0xBF58476D1CE4E5B9 + level * 0x94D049BB133111EB) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+
 class Store:
     """Class in wich the containers are soted"""
     _width: int
     _cash: int
     _containers_list: list
-
-    def __init__(self, width: int):
-        """Creates a Store of the given width"""
+    _locations: dict
+    _containers: dict
+    _height: int
+    _height_count: List[int]
+    _deadlines: Optional['DeadlineIndex']
+    _free_space: Optional['FreeSpaceIndex']
+    _journal: Optional[list]
+    _checkpoints: int
+    _hash: int
+
+    def __init__(self, width: int, track_deadlines: bool = False, track_free_space: bool = False):
+        """
+        Creates a Store of the given width (that keeps a DeadlineIndex of its containers if track_deadlines
+        and a FreeSpaceIndex of its stacks if track_free_space)
+        """
         
         assert width >= 0
         self._width = width 
         self._cash = 0
+        self._init_stacks()
+        self._height = 0
+        self._height_count = [self._width]
+        #_height_count[h] is the number of stacks of height h, so the store's height is the
+        #highest h with a stack and it can be kept up to date without looking at all the stacks
+        self._deadlines = DeadlineIndex() if track_deadlines else None
+        self._free_space = FreeSpaceIndex(width) if track_free_space else None
+        self._journal = None
+        self._checkpoints = 0
+        #while there are checkpoints, the undo journal keeps the (operation, container, position, ticket)
+        #of every add, remove, move and cash change so that restore can undo them one by one (the
+        #ticket in the DeadlineIndex of a removed container, so that it gets it back)
+        self._hash = 0
+        #xor of the zobrist_key of every container at its location, kept up to date by _add and _remove
+
+
+    def _init_stacks(self) -> None:
+        """Creates the empty stacks where the containers are kept and the indexes of their locations"""
+
         self._containers_list = [[] for i in range(self._width)]
         #we will store the containers in a list of lists where the X axis is indicates
         #the stack where the container is and the Y axis the height the container is.
+        self._locations = {}
+        #index identifier -> location of the containers in the store, kept up to date by _place and _unplace
+        #so that location, is_in_store and can_remove don't have to scan all the stacks
+        self._containers = {}
+        #identifier -> container, in the order they were stored (dicts keep the insertion order)
+
+
+    def _place(self, c: Container, p: Position, level: int) -> None:
+        """Puts c on the top of the stacks p, ..., p + c.size - 1 (all of them of height level)"""
+
+        for i in range(c.size):
+            self._containers_list[p + i].append(c)
+        #We add as many copies as the containers' size in each space it takes up in the list of lists
+        self._locations[c.identifier] = (level, p)
+        self._containers[c.identifier] = c
+
+
+    def _unplace(self, c: Container, p: Position, level: int) -> None:
+        """Takes c from the top of the stacks p, ..., p + c.size - 1"""
+
+        for i in range(c.size):
+            self._containers_list[p + i].pop() #c is the top container of all the stacks it takes up
+        #Com que tenim tantes copies com mida del contenidor, eliminem totes les copies
+        del self._locations[c.identifier]
+        del self._containers[c.identifier]
 
 
     def width(self) -> int:
@@ -60,11 +459,7 @@ class Store:
     def height(self) -> int:
         """Returns the store's height at that moment"""
        
-        height = 0
-        for p in self._containers_list:
-            if len(p) > height:
-                height = len(p)
-        return height
+        return self._height
 
 
     def cash(self) -> int:
@@ -78,6 +473,8 @@ class Store:
         
         assert amount >= 0
         self._cash += amount
+        if self._journal is not None:
+            self._journal.append(('cash', None, amount, 0))
 
 
     def add(self, c: Container, p: Position) -> None:
@@ -87,9 +484,29 @@ class Store:
         """
         
         assert self.can_add(c, p) #we make sure c can be added to p
-        for i in range(c.size):
-            self._containers_list[p + i].append(c)
-        #We add as many copies as the containers' size in each space it takes up in the list of lists
+        self._add(c, p)
+        if self._deadlines is not None:
+            self._deadlines.add(c)
+        if self._journal is not None:
+            self._journal.append(('add', c, p, 0))
+
+
+    def _add(self, c: Container, p: Position) -> None:
+        """Adds c to p keeping the indexes of the store up to date (but not the deadlines)"""
+
+        level = self.stack_height(p)
+        self._place(c, p, level)
+        self._hash ^= zobrist_key(c.identifier, p, level)
+        if self._free_space is not None:
+            self._free_space.set_height(p, c.size, level + 1)
+
+        #all the stacks c takes up go from height level to level + 1
+        if level + 1 == len(self._height_count):
+            self._height_count.append(0)
+        self._height_count[level] -= c.size
+        self._height_count[level + 1] += c.size
+        if level + 1 > self._height:
+            self._height = level + 1
 
 
     def remove(self, c: Container) -> None:
@@ -99,10 +516,28 @@ class Store:
         """
         
         assert self.can_remove(c) #we make sure c is removable
-        location_cont = self.location(c)[1]
-        for i in range(c.size):
-            self._containers_list[location_cont + i].remove(c) #aquesta funcio remove es la de les llistes (diferent de self.remove())
-        #Com que tenim tantes copies com mida del contenidor, eliminem totes les copies
+        if self._journal is not None:
+            ticket = self._deadlines.ticket(c) if self._deadlines is not None else 0
+            self._journal.append(('remove', c, self.location(c)[1], ticket)) #restored with its ticket, in the same order
+        self._remove(c)
+        if self._deadlines is not None:
+            self._deadlines.discard(c)
+
+
+    def _remove(self, c: Container) -> None:
+        """Removes c keeping the indexes of the store up to date (but not the deadlines)"""
+
+        level, location_cont = self.location(c)
+        self._unplace(c, location_cont, level)
+        self._hash ^= zobrist_key(c.identifier, location_cont, level)
+        if self._free_space is not None:
+            self._free_space.set_height(location_cont, c.size, level)
+
+        #all the stacks c took up go from height level + 1 to level
+        self._height_count[level + 1] -= c.size
+        self._height_count[level] += c.size
+        while self._height > 0 and self._height_count[self._height] == 0:
+            self._height -= 1
 
 
     def move(self, c: Container, p: Position) -> None:
@@ -112,19 +547,168 @@ class Store:
         """
         
         assert self.can_move(c, p) #we make sure c is movable
-        self.remove(c)
-        self.add(c, p)
+        if self._journal is not None:
+            self._journal.append(('move', c, self.location(c)[1], 0))
+        self._remove(c)
+        assert self.can_add(c, p)
+        self._add(c, p) #a moved container stays in the store, so its deadlines don't change
+
+
+    def checkpoint(self) -> int:
+        """
+        Returns a mark of the current state of the store that restore can go back to.
+        Checkpoints can be nested; they only cost the journal of the operations done after them.
+        """
+
+        if self._journal is None:
+            self._journal = []
+        self._checkpoints += 1
+        return len(self._journal)
+
+
+    def restore(self, mark: int) -> None:
+        """
+        Undoes all the operations done since the checkpoint mark (in O(operations), not O(store)).
+        The restored containers may be listed by containers() in another order.
+        Pre: mark must be a checkpoint that has not been restored or released
+        """
+
+        journal = self._journal
+        assert journal is not None and 0 <= mark <= len(journal)
+        while len(journal) > mark:
+            operation, c, p, ticket = journal.pop()
+            if operation == 'cash':
+                self._cash -= p
+            elif operation == 'add':
+                self._remove(c)
+                if self._deadlines is not None:
+                    self._deadlines.discard(c)
+            elif operation == 'remove': #c was the top of its stacks, and it is again now
+                self._add(c, p)
+                if self._deadlines is not None:
+                    self._deadlines.add(c, ticket)
+            else:
+                self._remove(c)
+                self._add(c, p)
+        self.release(mark)
+
+
+    def release(self, mark: int) -> None:
+        """
+        Keeps all the operations done since the checkpoint mark (they can still be undone by
+        the older checkpoints, if any)
+        Pre: mark must be a checkpoint that has not been restored or released
+        """
+
+        assert self._journal is not None and 0 <= mark <= len(self._journal)
+        self._checkpoints -= 1
+        if self._checkpoints == 0:
+            self._journal = None #there are no checkpoints left, nothing else has to be journaled
+
+
+    @contextmanager
+    def branch(self) -> Iterator['Store']:
+        """Context in which the operations done on the store are undone when it ends"""
+
+        mark = self.checkpoint()
+        try:
+            yield self
+        finally:
+            self.restore(mark)
+
+
+    def to_array(self) -> array:
+        """
+        Returns the containers of the store as an array with the fields of every container, its
+        position and its ticket in the DeadlineIndex (0 if there is none), 9 numbers per container.
+        They are in the order of containers(), in which from_array can add them again.
+        """
+
+        data = array('q')
+        for c in self.containers():
+            data.extend((c.identifier, c.size, c.value, c.arrival.start, c.arrival.end, c.delivery.start,
+                         c.delivery.end, self.location(c)[1],
+                         self._deadlines.ticket(c) if self._deadlines is not None else 0))
+        return data
+
+
+    def from_array(self, data: Sequence[int]) -> None:
+        """
+        Adds the containers of an array of to_array to the empty store (and to its DeadlineIndex
+        with the same tickets), so that it has the same stacks as the store of the array
+        """
+
+        assert self.num_containers() == 0 and len(data) % 9 == 0
+        for i in range(0, len(data), 9):
+            c = Container(data[i], data[i + 1], data[i + 2], TimeRange(data[i + 3], data[i + 4]),
+                          TimeRange(data[i + 5], data[i + 6]))
+            assert self.can_add(c, data[i + 7])
+            self._add(c, data[i + 7])
+            if self._deadlines is not None:
+                self._deadlines.add(c, data[i + 8] or None)
+
+
+    def state_hash(self) -> int:
+        """
+        Returns a 64 bits hash of the containers of the store and their locations (not of the cash):
+        the same for the same state, whatever the order of the actions that lead to it
+        """
+
+        return self._hash
 
 
     def containers(self) -> List[Container]:
-        """Returns the list of the containers that are in the store at that moment"""
+        """Returns the list of the containers that are in the store at that moment (in the order they were put in their locations)"""
         
-        cont_lst = []
-        for p in self._containers_list:
-            for c in p:
-                if c not in cont_lst: #we have to make sure that c is not in cont_lst because we added as many copies as the containers' size int the self._containers_list
-                    cont_lst.append(c)
-        return cont_lst
+        return list(self._containers.values())
+
+
+    def deadlines(self) -> Optional['DeadlineIndex']:
+        """Returns the index of the deadlines of the containers of the store (None if the store doesn't keep it)"""
+
+        return self._deadlines
+
+
+    def free_space(self) -> Optional['FreeSpaceIndex']:
+        """Returns the index of the runs of stacks of the same height (None if the store doesn't keep it)"""
+
+        return self._free_space
+
+
+    def positions_for(self, size: int) -> List[Position]:
+        """
+        Returns all the positions where a container of the size can be added, from left to right
+        Pre: the store must keep a FreeSpaceIndex
+        """
+
+        assert self._free_space is not None and size > 0
+        return self._free_space.positions(size)
+
+
+    def lowest_position(self, size: int) -> Optional[Position]:
+        """
+        Returns a position of the lowest height where a container of the size can be added (None if there is none)
+        Pre: the store must keep a FreeSpaceIndex
+        """
+
+        assert self._free_space is not None and size > 0
+        return self._free_space.lowest(size)
+
+
+    def position_at_height(self, size: int, height: int) -> Optional[Position]:
+        """
+        Returns a position where a container of the size can be added at the height (None if there is none)
+        Pre: the store must keep a FreeSpaceIndex
+        """
+
+        assert self._free_space is not None and size > 0
+        return self._free_space.at_height(size, height)
+
+
+    def num_containers(self) -> int:
+        """Returns the number of containers that are in the store at that moment"""
+
+        return len(self._containers)
 
 
     def removable_containers(self) -> List[Container]:
@@ -148,17 +732,24 @@ class Store:
         else:
             return None
 
+    def stack_height(self, p: Position) -> int:
+        """Returns the number of containers piled up in the position p"""
+
+        return len(self._containers_list[p])
+
+
+    def stack(self, p: Position) -> List[Container]:
+        """Returns the containers piled up in the position p from the bottom to the top"""
+
+        return list(self._containers_list[p])
+
     #revisar aquesta funcio assert/if/return(-1,-1)
     def location(self, c: Container) -> Location:
         """Returns the location of a container c if it is in the store and (-1, -1) if not"""
 
-        if self.is_in_store(c):
-            for p in self._containers_list:
-                if c in p:
-                    return (p.index(c), self._containers_list.index(p))
-                #the first component of the tuple is the position of the continer (in the stack)
-                #while the second is the position of the stack (in the list of lists)
-        return (-1, -1)
+        return self._locations.get(c.identifier, (-1, -1))
+        #the first component of the tuple is the position of the continer (in the stack)
+        #while the second is the position of the stack (in the list of lists)
 
 
     def can_add(self, c: Container, p: Position) -> bool:
@@ -200,16 +791,13 @@ class Store:
     def is_in_store(self, c: Container) -> bool:
         """Returns if a container c is in the store"""
 
-        for p in self._containers_list:
-            if c in p:
-                return True
-        return False
+        return c.identifier in self._locations
     
     
     def empty(self) -> bool:
         """Returns if the store is empty"""
 
-        return self._containers_list == [[] for i in range(self._width)]
+        return self.num_containers() == 0
 
 
     def write(self, stdscr: curses.window, caption: str = ''):
@@ -241,97 +829,1308 @@ class Store:
         time.sleep(delay)
 
 
-class Logger:
+class CompactStore(Store):
+    """
+    Store with the same interface as Store but with a compact representation for wide stores:
+    every stack is an array of the slots (small integers) of its containers, and the containers
+    themselves are kept only once in a slot table with their level and position in parallel
+    arrays, found by identifier in an array identifier -> slot + 1 (0 if it is not in the store).
+    A container of size k takes k cells of 4 bytes instead of k references in k different lists,
+    and its location three array cells instead of a tuple in a dict: about 40 bytes per container
+    against about 150 of Store with the identifiers of a containers file (0 to the number of
+    containers), as the slot table takes 4 bytes for every identifier up to the largest one added.
+    Pre: the identifiers of the containers are not negative
+    """
+    _heights: array
+    _columns: List[array]
+    _slots: List[Optional[Container]]
+    _slot_level: array
+    _slot_position: array
+    _free_slots: array
+    _slot_of: array
+    _count: int
 
-    """Class to log store actions to a file."""
 
-    _file: TextIO
+    def _init_stacks(self) -> None:
+        """Creates the empty arrays where the containers are kept and the slot table"""
 
-    def __init__(self, path: str, name: str, width: int):
-        self._file = open(path, 'w')
-        print(0, 'START', name, width, file=self._file)
+        self._heights = array('i', bytes(4 * self._width))
+        self._columns = [array('i') for p in range(self._width)]
+        #_columns[p][level] is the slot of the container in the stack p at that level
+        self._slots = []
+        self._slot_level = array('i')
+        self._slot_position = array('i')
+        self._free_slots = array('i')
+        self._slot_of = array('i')
+        self._count = 0
 
-    def add(self, t: TimeStamp, c: Container, p: Position):
-        print(t, 'ADD', c.identifier, p, file=self._file)
 
-    def remove(self, t: TimeStamp, c: Container):
-        print(t, 'REMOVE', c.identifier, file=self._file)
+    def _slot(self, c: Container) -> int:
+        """Returns the slot of the container c (-1 if it is not in the store)"""
 
-    def move(self, t: TimeStamp, c: Container, p: Position):
-        print(t, 'MOVE', c.identifier, p, file=self._file)
+        return self._slot_of[c.identifier] - 1 if c.identifier < len(self._slot_of) else -1
 
-    def cash(self, t: TimeStamp, cash: int):
-        print(t, 'CASH', cash, file=self._file)
 
+    def _place(self, c: Container, p: Position, level: int) -> None:
+        """Puts c on the top of the stacks p, ..., p + c.size - 1 (all of them of height level)"""
 
-def read_containers(path: str) -> List[Container]:
-    """Returns a list of containers read from a file at path."""
+        assert c.identifier >= 0
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._slots[slot] = c
+            self._slot_level[slot] = level
+            self._slot_position[slot] = p
+        else:
+            slot = len(self._slots)
+            self._slots.append(c)
+            self._slot_level.append(level)
+            self._slot_position.append(p)
+        if c.identifier >= len(self._slot_of): #it grows by halves at least, so adding is O(1) amortized
+            self._slot_of.frombytes(bytes(4 * max(c.identifier + 1 - len(self._slot_of), len(self._slot_of) // 2)))
+        self._slot_of[c.identifier] = slot + 1
+        self._count += 1
+        for i in range(p, p + c.size):
+            self._columns[i].append(slot)
+        self._heights[p:p + c.size] = array('i', [level + 1]) * c.size
+
+
+    def _unplace(self, c: Container, p: Position, level: int) -> None:
+        """Takes c from the top of the stacks p, ..., p + c.size - 1"""
+
+        slot = self._slot(c)
+        self._slot_of[c.identifier] = 0
+        self._count -= 1
+        self._slots[slot] = None
+        self._free_slots.append(slot)
+        for i in range(p, p + c.size):
+            self._columns[i].pop()
+        self._heights[p:p + c.size] = array('i', [level]) * c.size
 
-    with open(path, 'r') as file:
-        containers: List[Container] = []
-        for line in file:
-            identifier, size, value, arrival_start, arrival_end, delivery_start, delivery_end = map(
-                int, line.split())
-            container = Container(identifier, size, value, TimeRange(
-                arrival_start, arrival_end), TimeRange(delivery_start, delivery_end))
-            containers.append(container)
-        return containers
 
+    def location(self, c: Container) -> Location:
+        """Returns the location of a container c if it is in the store and (-1, -1) if not"""
 
-def check_and_show(containers_path: str, log_path: str, stdscr: Optional[curses.window] = None):
-    """
-    Check that the actions stored in the log at log_path with the containers at containers_path are legal.
-    Raise an exception if not.
-    In the case that stdscr is not None, the store is written after each action.
-    """
+        slot = self._slot(c)
+        if slot < 0:
+            return (-1, -1)
+        return (self._slot_level[slot], self._slot_position[slot])
 
-    # get the data
-    containers_list = read_containers(containers_path)
-    containers_map = {c.identifier: c for c in containers_list}
-    log = open(log_path, 'r')
-    lines = log.readlines()
 
-    # process first line
-    tokens = lines[0].split()
-    assert len(tokens) == 4
-    assert tokens[0] == "0"
-    assert tokens[1] == "START"
-    name = tokens[2]
-    width = int(tokens[3])
-    last = 0
-    store = Store(width)
-    if stdscr:
-        store.write(stdscr)
+    def is_in_store(self, c: Container) -> bool:
+        """Returns if a container c is in the store"""
 
-    # process remaining lines
-    for line in lines[1:]:
-        tokens = line.split()
-        time = int(tokens[0])
-        what = tokens[1]
-        assert time >= last
-        last = time
+        return self._slot(c) >= 0
 
-        if what == "CASH":
-            cash = int(tokens[2])
-            assert cash == store.cash()
 
-        elif what == "ADD":
-            identifier, position = int(tokens[2]), int(tokens[3])
-            store.add(containers_map[identifier], position)
+    def num_containers(self) -> int:
+        """Returns the number of containers that are in the store at that moment"""
 
-        elif what == "REMOVE":
-            identifier = int(tokens[2])
-            container = containers_map[identifier]
-            store.remove(container)
-            if container.delivery.start <= time < container.delivery.end:
-                store.add_cash(container.value)
+        return self._count
 
-        elif what == "MOVE":
-            identifier, position = int(tokens[2]), int(tokens[3])
-            store.move(containers_map[identifier], position)
 
-        else:
-            assert False
+    def containers(self) -> List[Container]:
+        """Returns the list of the containers that are in the store at that moment (by level and position)"""
 
-        if stdscr:
-            store.write(stdscr, f'{name} t: {time}')
\ No newline at end of file
+        slots = sorted((slot for slot, c in enumerate(self._slots) if c is not None),
+                       key=lambda slot: (self._slot_level[slot], self._slot_position[slot]))
+        return [self._slots[slot] for slot in slots]
+
+
+    def stack_height(self, p: Position) -> int:
+        """Returns the number of containers piled up in the position p"""
+
+        return self._heights[p]
+
+
+    def stack(self, p: Position) -> List[Container]:
+        """Returns the containers piled up in the position p from the bottom to the top"""
+
+        return [self._slots[slot] for slot in self._columns[p]]
+
+
+    def top_container(self, p: Position) -> Optional[Container]:
+        """Returns the container c of the top of a position p if the position is not empty and None if it is"""
+
+        column = self._columns[p]
+        return self._slots[column[-1]] if column else None
+
+
+    def can_add(self, c: Container, p: Position) -> bool:
+        """Returns if a container c can be added to a position p"""
+
+        #all the stacks that c would take up must have the height of the stack p
+        return self._heights[p:p + c.size].count(self._heights[p]) == c.size
+
+
+class TranspositionCache:
+    """
+    Bounded cache of the evaluations of the states of a store (by Store.state_hash) for the
+    search strategies: when it is full, the least recently used evaluation is forgotten.
+    """
+    _capacity: int
+    _entries: OrderedDict
+    hits: int
+    misses: int
+
+    def __init__(self, capacity: int = 1 << 16):
+        """Creates an empty cache of at most capacity evaluations"""
+
+        assert capacity > 0
+        self._capacity = capacity
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+
+    def __len__(self) -> int:
+        """Returns the number of evaluations in the cache"""
+
+        return len(self._entries)
+
+
+    def __contains__(self, key: int) -> bool:
+        """Returns if the evaluation of the state key is in the cache"""
+
+        return key in self._entries
+
+
+    def get(self, key: int, default: object = None) -> object:
+        """Returns the evaluation of the state key (default if it is not in the cache)"""
+
+        if key not in self._entries:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+
+    def put(self, key: int, value: object) -> None:
+        """Keeps the evaluation value of the state key"""
+
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._capacity:
+            self._entries.popitem(last=False)
+
+
+    def clear(self) -> None:
+        """Forgets all the evaluations"""
+
+        self._entries.clear()
+
+
+class Renderer:
+    """
+    Draws a store on a curses window while a log is replayed.
+    Only the stacks that changed since the last frame are redrawn, at most fps frames
+    per second are drawn (the actions in between are not drawn if we are late) and the
+    replay goes at speed actions per second (as fast as the frames allow with speed 0).
+    The actions before start_time are not shown.
+    """
+
+    _stdscr: curses.window
+    _fps: float
+    _speed: float
+    _start_time: TimeStamp
+    _maximum: int
+    _stacks: list
+    _actions: int
+    _start: float
+    _next_frame: float
+
+    def __init__(self, stdscr: curses.window, fps: float = 30, speed: float = 0, start_time: TimeStamp = 0):
+        self._stdscr = stdscr
+        self._fps = fps
+        self._speed = speed
+        self._start_time = start_time
+        self._maximum = 15  # maximum number of rows to write
+        self._stacks = []  # what is drawn in every stack (empty until the first frame)
+        self._actions = 0
+        self._start = 0.0
+        self._next_frame = 0.0
+
+    def _draw_stack(self, store: Store, p: Position, drawn: list) -> None:
+        """Draws the visible containers of the stack p"""
+
+        for row in range(self._maximum):
+            y = self._maximum - row + 2
+            if row < len(drawn):
+                identifier, first = drawn[row]
+                color = curses.color_pair(1 + identifier * 764351 % 250)  # some random color depending on the identifier of the container
+                text = str(identifier % 100).ljust(2) if first else '  '
+                self._stdscr.addstr(y, 2 * p, text, color)
+            else:
+                self._stdscr.addstr(y, 2 * p, '  ')
+
+    def draw(self, store: Store, caption: str = '') -> None:
+        """Draws the store redrawing only the stacks that changed since the last frame"""
+
+        if not self._stacks: #first frame
+            self._stdscr.clear()
+            self._stdscr.addstr(self._maximum + 3, 0, '—' * 2 * store.width())
+            self._stacks = [None] * store.width()
+
+        self._stdscr.move(0, 0)
+        self._stdscr.clrtoeol()
+        self._stdscr.addstr(0, 0, caption)
+        self._stdscr.move(self._maximum + 4, 0)
+        self._stdscr.clrtoeol()
+        self._stdscr.addstr(self._maximum + 4, 0, '$: ' + str(store.cash()))
+
+        for p in range(store.width()):
+            drawn = [(c.identifier, store.location(c)[1] == p) for c in store.stack(p)[:self._maximum]]
+            #the identifier is only written in the first stack of the container
+            if drawn != self._stacks[p]:
+                self._draw_stack(store, p, drawn)
+                self._stacks[p] = drawn
+
+        self._stdscr.refresh()
+        self._next_frame = time.perf_counter() + 1 / self._fps
+
+    def show(self, store: Store, t: TimeStamp, caption: str = '') -> None:
+        """Shows the store after an action done at time t"""
+
+        if t < self._start_time:
+            return
+        now = time.perf_counter()
+        if self._speed <= 0: #unlimited: only the frames are limited
+            if now >= self._next_frame:
+                self.draw(store, caption)
+            return
+        if self._actions == 0:
+            self._start = now
+        self._actions += 1
+        due = self._start + self._actions / self._speed  # when the action should be shown
+
+        if due - now > 1 / self._fps: #we are ahead: we draw it and wait
+            self.draw(store, caption)
+            time.sleep(max(0.0, due - time.perf_counter()))
+        elif now >= self._next_frame: #otherwise we only draw if it is time for a new frame
+            self.draw(store, caption)
+
+
+LOG_BUFFER = 4096 # records kept in memory by a buffered Logger before writing them
+
+# binary logs: a header with the name of the strategy and then one fixed-width record
+# (time, opcode, identifier, position or cash) for every line of the text log
+BINARY_LOG_MAGIC = b'MAGLOG1\n'
+BINARY_LOG_RECORD = struct.Struct('<iBii') # 13 bytes, the numbers must fit in 32 bits
+OPCODES = {'START': 0, 'ADD': 1, 'REMOVE': 2, 'MOVE': 3, 'CASH': 4}
+OPERATIONS = {code: what for what, code in OPCODES.items()}
+
+
+class Logger:
+
+    """
+    Class to log store actions to a file.
+    With buffer_size > 0 the records are kept in memory and written in blocks of buffer_size
+    records; with binary=True the log is written in the binary format instead of the text one.
+    The log must be closed (or flushed) to make sure that all the records are in the file.
+    With resume_offset the log already in the file is continued from that byte (what is after
+    it is discarded) instead of starting a new one.
+    """
+
+    _file: Optional[BinaryIO]
+    _buffer: list
+    _buffer_size: int
+    _binary: bool
+
+    def __init__(self, path: str, name: str, width: int, buffer_size: int = 0, binary: bool = False,
+                 resume_offset: Optional[int] = None):
+        self._buffer = []
+        self._buffer_size = buffer_size
+        self._binary = binary
+        self._file = open(path, 'wb' if resume_offset is None else 'r+b')
+        if resume_offset is not None: #the START of the log is already in the file
+            self._file.truncate(resume_offset)
+            self._file.seek(resume_offset)
+        elif binary:
+            name_bytes = name.encode()
+            self._buffer.append(BINARY_LOG_MAGIC + struct.pack('<H', len(name_bytes)) + name_bytes)
+            self._write(0, 'START', 0, width)
+        else:
+            self._write_line(f'0 START {name} {width}\n')
+
+    def _write_line(self, line: str):
+        self._buffer.append(line.encode())
+        if len(self._buffer) > self._buffer_size:
+            self._write_buffer()
+
+    def _write(self, t: TimeStamp, what: str, identifier: int, argument: int):
+        self._buffer.append(BINARY_LOG_RECORD.pack(t, OPCODES[what], identifier, argument))
+        if len(self._buffer) > self._buffer_size:
+            self._write_buffer()
+
+    def add(self, t: TimeStamp, c: Container, p: Position):
+        if self._binary:
+            self._write(t, 'ADD', c.identifier, p)
+        else:
+            self._write_line(f'{t} ADD {c.identifier} {p}\n')
+
+    def remove(self, t: TimeStamp, c: Container):
+        if self._binary:
+            self._write(t, 'REMOVE', c.identifier, 0)
+        else:
+            self._write_line(f'{t} REMOVE {c.identifier}\n')
+
+    def move(self, t: TimeStamp, c: Container, p: Position):
+        if self._binary:
+            self._write(t, 'MOVE', c.identifier, p)
+        else:
+            self._write_line(f'{t} MOVE {c.identifier} {p}\n')
+
+    def cash(self, t: TimeStamp, cash: int):
+        if self._binary:
+            self._write(t, 'CASH', 0, cash)
+        else:
+            self._write_line(f'{t} CASH {cash}\n')
+
+    def _write_buffer(self):
+        self._file.write(b''.join(self._buffer))
+        self._buffer.clear()
+
+    def flush(self):
+        """Writes the records kept in memory to the file."""
+
+        if self._buffer:
+            self._write_buffer()
+        self._file.flush()
+
+    def offset(self) -> int:
+        """Writes the records kept in memory and returns the length in bytes of the log."""
+
+        self.flush()
+        return self._file.tell()
+
+    def close(self):
+        """Writes the records kept in memory and closes the file."""
+
+        if getattr(self, '_file', None) is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'Logger':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __del__(self):
+        self.close() #the records kept in memory are not lost if the log is not closed
+
+
+def iter_binary_log(path: str) -> Iterator[Tuple[TimeStamp, str, int, int]]:
+    """Yields the records (time, operation, identifier, position or cash) of a binary log. The first one is START."""
+
+    with open(path, 'rb') as file:
+        assert file.read(len(BINARY_LOG_MAGIC)) == BINARY_LOG_MAGIC
+        length, = struct.unpack('<H', file.read(2))
+        file.read(length) #name of the strategy (read by binary_log_name)
+        while True:
+            block = file.read(BINARY_LOG_RECORD.size * LOG_BUFFER)
+            if not block:
+                break
+            for t, code, identifier, argument in BINARY_LOG_RECORD.iter_unpack(block):
+                yield t, OPERATIONS[code], identifier, argument
+
+
+def binary_log_name(path: str) -> str:
+    """Returns the name of the strategy of a binary log."""
+
+    with open(path, 'rb') as file:
+        assert file.read(len(BINARY_LOG_MAGIC)) == BINARY_LOG_MAGIC
+        length, = struct.unpack('<H', file.read(2))
+        return file.read(length).decode()
+
+
+def binary_log_to_text(binary_path: str, text_path: str) -> None:
+    """Writes the binary log at binary_path as a text log at text_path."""
+
+    with open(text_path, 'w') as file:
+        lines = []
+        for t, what, identifier, argument in iter_binary_log(binary_path):
+            if what == 'START':
+                lines.append(f'0 START {binary_log_name(binary_path)} {argument}\n')
+            elif what == 'REMOVE':
+                lines.append(f'{t} REMOVE {identifier}\n')
+            elif what == 'CASH':
+                lines.append(f'{t} CASH {argument}\n')
+            else: #ADD or MOVE
+                lines.append(f'{t} {what} {identifier} {argument}\n')
+            if len(lines) >= LOG_BUFFER:
+                file.write(''.join(lines))
+                lines.clear()
+        file.write(''.join(lines))
+
+
+def text_log_to_binary(text_path: str, binary_path: str) -> None:
+    """Writes the text log at text_path as a binary log at binary_path."""
+
+    with open(text_path, 'r') as file:
+        tokens = file.readline().split()
+        assert len(tokens) == 4 and tokens[1] == 'START'
+        with Logger(binary_path, tokens[2], int(tokens[3]), LOG_BUFFER, binary=True) as log:
+            for line in file:
+                tokens = line.split()
+                t, what = int(tokens[0]), tokens[1]
+                if what == 'REMOVE':
+                    log._write(t, what, int(tokens[2]), 0)
+                elif what == 'CASH':
+                    log._write(t, what, 0, int(tokens[2]))
+                else: #ADD or MOVE
+                    log._write(t, what, int(tokens[2]), int(tokens[3]))
+
+
+CHUNK_SIZE = 1 << 20 # bytes of the files read at once by the streaming readers
+
+
+def parse_fields(block: bytes) -> List[int]:
+    """
+    Returns the numbers of a block of complete lines of a containers file, one after the other.
+    The fields can be separated by spaces or tabs (bytes.split() splits by any whitespace).
+    Raises ValueError if a line that is not blank doesn't have the 7 fields of a container.
+    """
+
+    lines = list(map(bytes.split, block.splitlines()))
+    if not set(map(len, lines)) <= {0, 7}: #a wrong line would shift the fields of all the next ones
+        line = next(line for line in lines if len(line) not in (0, 7))
+        raise ValueError(f'a container record has 7 fields: {b" ".join(line)!r}')
+    return list(map(int, itertools.chain.from_iterable(lines)))
+
+
+def iter_blocks(path: str, chunk_size: int = CHUNK_SIZE, start: int = 0) -> Iterator[bytes]:
+    """
+    Yields the file at path (from the byte start, that must be the start of a line) in blocks of
+    about chunk_size bytes that always end at the end of a line. The blocks are one after the other.
+    """
+
+    with open(path, 'rb') as file:
+        file.seek(start)
+        rest = b''
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            end = chunk.rfind(b'\n') + 1
+            if end == 0: #the chunk doesn't finish any line
+                rest += chunk
+            else:
+                yield rest + chunk[:end]
+                rest = chunk[end:]
+        if rest.strip():
+            yield rest #last line without end of line
+
+
+def iter_containers(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Container]:
+    """
+    Yields the containers of the file at path one after the other. The file is read
+    lazily in blocks of chunk_size bytes, so the memory used doesn't depend on its length.
+    """
+
+    for block in iter_blocks(path, chunk_size):
+        yield from block_containers(block)
+
+
+def block_containers(block: bytes) -> List[Container]:
+    """Returns the containers of a block of complete lines of a containers file"""
+
+    fields = iter(parse_fields(block))
+    return [Container(identifier, size, value, TimeRange(arrival_start, arrival_end), TimeRange(delivery_start, delivery_end))
+            for identifier, size, value, arrival_start, arrival_end, delivery_start, delivery_end in zip(
+                fields, fields, fields, fields, fields, fields, fields)]
+
+
+def block_line_ends(block: bytes) -> List[int]:
+    """Returns the offset in a block of complete lines of the end of every line with a container (as block_containers)"""
+
+    ends = []
+    start = 0
+    while start < len(block):
+        end = block.find(b'\n', start) + 1 or len(block) #the last line can have no end of line
+        if not block[start:end].isspace():
+            ends.append(end)
+        start = end
+    return ends
+
+
+def iter_manifests(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Manifest]:
+    """Yields the containers of the file at path as manifests of the containers of each block of chunk_size bytes."""
+
+    for block in iter_blocks(path, chunk_size):
+        yield Manifest(parse_fields(block))
+
+
+def read_containers(path: str) -> List[Container]:
+    """Returns a list of containers read from a file at path."""
+
+    return list(iter_containers(path))
+
+
+def read_manifest(path: str) -> Manifest:
+    """Returns the manifest (the containers by columns) read from a file at path."""
+
+    with open(path, 'rb') as file:
+        return Manifest(parse_fields(file.read()))
+
+
+INDEX_STRIDE = 1 << 16 # bytes of a file between the entries of its TimeIndex
+
+# sidecar of a TimeIndex: the header (size and modification time of the file, stride, column,
+# entries) and then the (timestamp, offset) of every entry (in the byte order of the machine)
+TIME_INDEX_MAGIC = b'MAGIDX1\n'
+TIME_INDEX_HEADER = struct.Struct('<5q')
+MANIFEST_TIME_COLUMN = 3 # arrival start of a containers file
+LOG_TIME_COLUMN = 0 # time of a text log
+
+
+class TimeIndex:
+    """
+    Sparse index timestamp -> byte offset of a text file whose lines are sorted by the timestamp
+    of a column (the arrival start of a containers file or the time of a text log).
+    The file is memory mapped and only the line after every stride bytes is read to build the
+    index, so that it doesn't depend on the length of the file; seek then reads at most the
+    stride bytes after an entry. The index is kept in a sidecar file (path + '.tidx') that is
+    used while the file doesn't change.
+    """
+
+    _path: str
+    _column: int
+    _stride: int
+    _file: Optional[BinaryIO]
+    _map: Optional[mmap.mmap]
+    _times: array
+    _offsets: array
+
+    def __init__(self, path: str, column: int, stride: int = INDEX_STRIDE, cache: bool = True):
+        """Creates the index of the file at path by the timestamps of the column (using or writing the sidecar if cache)"""
+
+        assert column >= 0 and stride > 0
+        self._path = path
+        self._column = column
+        self._stride = stride
+        self._file = open(path, 'rb')
+        self._map = None
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size > 0 else None
+            if not (cache and self._load()):
+                self._build()
+                if cache:
+                    self._save()
+        except BaseException: #a file that cannot be indexed is not left open
+            self.close()
+            raise
+
+
+    def _key(self) -> Tuple[int, int, int, int]:
+        """Returns what must not change for the sidecar to be valid"""
+
+        stat = os.fstat(self._file.fileno())
+        return stat.st_size, stat.st_mtime_ns, self._stride, self._column
+
+
+    def _timestamp(self, offset: int) -> int:
+        """Returns the timestamp of the line that starts at offset"""
+
+        end = self._map.find(b'\n', offset)
+        return int(self._map[offset:end if end >= 0 else len(self._map)].split(None, self._column + 1)[self._column])
+
+
+    def _next_line(self, offset: int) -> int:
+        """Returns the offset of the line after the one of the byte offset (the length of the file if there is none)"""
+
+        end = self._map.find(b'\n', offset)
+        return end + 1 if end >= 0 else len(self._map)
+
+
+    def _is_blank(self, offset: int) -> bool:
+        """Returns if the line that starts at offset has only whitespace"""
+
+        return not self._map[offset:self._next_line(offset)].strip()
+
+
+    def _build(self) -> None:
+        """Reads the line after every stride bytes"""
+
+        self._times = array('q')
+        self._offsets = array('q')
+        if self._map is None:
+            return
+        offset = 0
+        while offset < len(self._map):
+            if not self._is_blank(offset): #not an empty line (at the end)
+                t = self._timestamp(offset)
+                assert not self._times or self._times[-1] <= t, 'the lines are not sorted by the timestamp'
+                self._times.append(t)
+                self._offsets.append(offset)
+            offset = self._next_line(offset + self._stride - 1) if offset + self._stride <= len(self._map) else len(self._map)
+
+
+    def _load(self) -> bool:
+        """Reads the sidecar and returns if it was valid"""
+
+        try:
+            with open(self._path + '.tidx', 'rb') as file:
+                content = file.read()
+        except OSError:
+            return False
+        start = len(TIME_INDEX_MAGIC) + TIME_INDEX_HEADER.size
+        if not content.startswith(TIME_INDEX_MAGIC) or len(content) < start:
+            return False
+        *key, n = TIME_INDEX_HEADER.unpack_from(content, len(TIME_INDEX_MAGIC))
+        if tuple(key) != self._key() or len(content) != start + 16 * n:
+            return False
+        entries = array('q')
+        entries.frombytes(content[start:])
+        self._times, self._offsets = entries[0::2], entries[1::2]
+        return True
+
+
+    def _save(self) -> None:
+        """Writes the sidecar (if it can be written)"""
+
+        entries = array('q', bytes(16 * len(self._times)))
+        entries[0::2], entries[1::2] = self._times, self._offsets
+        try:
+            with open(self._path + '.tidx', 'wb') as file:
+                file.write(TIME_INDEX_MAGIC + TIME_INDEX_HEADER.pack(*self._key(), len(self._times)) + entries.tobytes())
+        except OSError: #the index is only slower to build without the sidecar
+            pass
+
+
+    def seek(self, t: TimeStamp) -> int:
+        """Returns the offset of the first line with a timestamp >= t (the length of the file if there is none)"""
+
+        if self._map is None:
+            return 0
+        i = bisect.bisect_left(self._times, t) - 1 #the last entry before t (the lines of t can start before an entry)
+        offset = self._offsets[i] if i >= 0 else 0
+        while offset < len(self._map) and (self._is_blank(offset) or self._timestamp(offset) < t):
+            offset = self._next_line(offset)
+        return offset
+
+
+    def lines(self, t: TimeStamp) -> Iterator[bytes]:
+        """Yields the lines of the file from the first one with a timestamp >= t"""
+
+        if self._map is None:
+            return
+        offset = self.seek(t)
+        while offset < len(self._map):
+            end = self._next_line(offset)
+            yield self._map[offset:end]
+            offset = end
+
+
+    def close(self) -> None:
+        """Unmaps and closes the file"""
+
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+    def __enter__(self) -> 'TimeIndex':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def iter_containers_from(path: str, t: TimeStamp, chunk_size: int = CHUNK_SIZE) -> Iterator[Container]:
+    """Yields the containers of the file at path that arrive from time t on (without reading the ones before)"""
+
+    with TimeIndex(path, MANIFEST_TIME_COLUMN) as index:
+        start = index.seek(t)
+    for block in iter_blocks(path, chunk_size, start):
+        yield from block_containers(block)
+
+
+def iter_log_from(path: str, t: TimeStamp) -> Iterator[list]:
+    """Yields the tokens of the lines of the text log at path from time t on (without reading the ones before)"""
+
+    with TimeIndex(path, LOG_TIME_COLUMN) as index:
+        for line in index.lines(t):
+            if line.strip():
+                yield line.decode().split()
+
+
+def check_and_show(containers_path: str, log_path: str, stdscr: Optional[curses.window] = None,
+                   fps: float = 30, speed: float = 0, start_time: TimeStamp = 0):
+    """
+    Check that the actions stored in the log at log_path with the containers at containers_path are legal.
+    Raise an exception if not.
+    In the case that stdscr is not None, the store is shown after the actions (see Renderer) from start_time on.
+    """
+
+    # get the data
+    containers_map = {c.identifier: c for c in iter_containers(containers_path)}
+    log = open(log_path, 'r') #the log is read line by line
+
+    # process first line
+    tokens = log.readline().split()
+    assert len(tokens) == 4
+    assert tokens[0] == "0"
+    assert tokens[1] == "START"
+    name = tokens[2]
+    width = int(tokens[3])
+    last = 0
+    store = Store(width)
+    if stdscr:
+        renderer = Renderer(stdscr, fps, speed, start_time)
+        renderer.draw(store)
+
+    # process remaining lines
+    for line in log:
+        tokens = line.split()
+        time = int(tokens[0])
+        what = tokens[1]
+        assert time >= last
+        last = time
+
+        if what == "CASH":
+            cash = int(tokens[2])
+            assert cash == store.cash()
+
+        elif what == "ADD":
+            identifier, position = int(tokens[2]), int(tokens[3])
+            store.add(containers_map[identifier], position)
+
+        elif what == "REMOVE":
+            identifier = int(tokens[2])
+            container = containers_map[identifier]
+            store.remove(container)
+            if container.delivery.start <= time < container.delivery.end:
+                store.add_cash(container.value)
+
+        elif what == "MOVE":
+            identifier, position = int(tokens[2]), int(tokens[3])
+            store.move(containers_map[identifier], position)
+
+        else:
+            assert False
+
+        if stdscr:
+            renderer.show(store, time, f'{name} t: {time}')
+
+    if stdscr:
+        renderer.draw(store, f'{name} t: {last}') #last state
+
+class Layout:
+    """
+    Stacks used by the strategies: every size of container has one or more pairs of stacks
+    (first and second) as wide as the size, one next to the other. The containers that arrive
+    are added to a first stack and the strategies move them from every stack to the other one
+    of its pair, going over the stacks in the order of the cycle (the positions from left to right).
+    """
+
+    _pairs: dict
+    _partner: dict
+    _next: dict
+    _cycle: List[Position]
+
+    def __init__(self, pairs: dict):
+        """Creates the layout with the positions of the first stacks of the pairs of every size"""
+
+        self._pairs = pairs
+        self._partner = {}
+        for size, firsts in pairs.items():
+            for p in firsts:
+                self._partner[p] = p + size
+                self._partner[p + size] = p
+        self._cycle = sorted(self._partner)
+        self._next = {p: self._cycle[(i + 1) % len(self._cycle)] for i, p in enumerate(self._cycle)}
+
+
+    def sizes(self) -> List[int]:
+        """Returns the sizes of containers that have stacks"""
+
+        return sorted(self._pairs)
+
+
+    def pairs(self, size: int) -> List[Position]:
+        """Returns the positions of the first stacks of the pairs of a size"""
+
+        return self._pairs[size]
+
+
+    def cycle(self) -> List[Position]:
+        """Returns the positions of all the stacks in the order of the cycle"""
+
+        return self._cycle
+
+
+    def partner(self, p: Position) -> Position:
+        """Returns the position of the other stack of the pair of the stack p"""
+
+        return self._partner[p]
+
+
+    def next_position(self, p: Position) -> Position:
+        """Returns the position of the stack after p in the cycle"""
+
+        return self._next[p]
+
+
+    def first_position(self, size: int, store: Store) -> Position:
+        """Returns the first stack of the pair of a size with the fewest containers (the leftmost one if there is a tie)"""
+
+        assert size in self._pairs #there are no stacks for the size
+        return min(self._pairs[size], key=lambda p: store.stack_height(p) + store.stack_height(p + size))
+
+
+def plan_layout(width: int, size_mix: Optional[dict] = None, spread: bool = True) -> Layout:
+    """
+    Returns the layout for a store of a certain width given the number of containers of
+    every size (size_mix, sizes 1 to 4 in equal number by default). Every size gets a pair
+    of stacks and, if spread, the rest of the width is used for more pairs, each time for
+    the size with the most containers per pair (that fits).
+    """
+
+    if size_mix is None:
+        size_mix = {1: 1, 2: 1, 3: 1, 4: 1}
+    sizes = sorted(size for size in size_mix if size_mix[size] > 0)
+    assert 2 * sum(sizes) <= width, f'store too narrow for sizes {sizes}: width {width} < {2 * sum(sizes)}' #every size needs a pair of stacks
+
+    count = {size: 1 for size in sizes}
+    free = width - 2 * sum(sizes) if spread else 0
+    while True:
+        fits = [size for size in sizes if 2 * size <= free]
+        if not fits:
+            break
+        size = max(fits, key=lambda size: (size_mix[size] / count[size], -size))
+        count[size] += 1
+        free -= 2 * size
+
+    pairs = {}
+    p = 0
+    for size in sizes: #the pairs of every size one next to the other
+        pairs[size] = [p + 2 * size * i for i in range(count[size])]
+        p += 2 * size * count[size]
+    return Layout(pairs)
+
+
+def size_mix(path: str) -> dict:
+    """Returns the number of containers of every size of the containers file at path"""
+
+    mix: dict = {}
+    for manifest in iter_manifests(path):
+        for size in set(manifest.size):
+            mix[size] = mix.get(size, 0) + manifest.size.count(size)
+    return mix
+
+
+CHECKPOINT_EVERY = 1000 # containers between the checkpoints of run_strategy
+
+# checkpoints of a strategy: the header (arrivals, offset of the next container in the containers file,
+# time, position, searches, cash, length of the log, width, containers) and then the array of
+# Store.to_array (in the byte order of the machine)
+CHECKPOINT_MAGIC = b'MAGCKP3\n'
+CHECKPOINT_HEADER = struct.Struct('<9q')
+
+
+def checkpoint_log_offset(checkpoint_path: Optional[str], resume: bool) -> Optional[int]:
+    """
+    Returns the length of the log saved in the checkpoint at checkpoint_path if the run resumes
+    from it, the resume_offset of its strategy (None if not resume or there is no checkpoint)
+    """
+
+    if not resume or checkpoint_path is None or not os.path.exists(checkpoint_path):
+        return None
+    with open(checkpoint_path, 'rb') as file:
+        content = file.read(len(CHECKPOINT_MAGIC) + CHECKPOINT_HEADER.size)
+    assert content.startswith(CHECKPOINT_MAGIC), 'not a checkpoint'
+    return CHECKPOINT_HEADER.unpack_from(content, len(CHECKPOINT_MAGIC))[6]
+
+
+class Engine(ABC):
+    """
+    Execution engine shared by the strategies. It owns the clock, the store and the logger and
+    does the actions (add, move, deliver or discard) keeping the three of them up to date.
+    The strategies inherit from it and implement what they have to decide: on_arrival and next_action.
+    wide_layout tells if the strategy uses all the width of the store (plan_layout with spread)
+    or only a pair of stacks for every size, as the cycling strategies, that get worse when
+    they have more stacks to go over.
+    """
+
+    wide_layout: bool = False
+    _time: int
+    _position: int
+    _searches: int
+    _log: Logger
+    _store: Store
+    _layout: Layout
+    _placement: str
+
+
+    def __init__(self, width: int, log_path: str, name: str, layout: Optional[Layout] = None, placement: str = 'layout',
+                 resume_offset: Optional[int] = None):
+        """
+        Creates the engine of a strategy. With placement 'layout' (the default) the containers that
+        arrive go to the first stack of their size with the fewest containers and with 'deadline' to
+        the stack of their size where they block the least (see placement_cost). Only the stacks of
+        the layout are scored, not every position where the container can be added, because the
+        strategies only go over those stacks. 'deadline' is not better on every containers file, so
+        it has to be chosen. With resume_offset the log at log_path is continued from that byte, to
+        resume the run from a checkpoint (see load_checkpoint).
+        """
+
+        assert placement in ('layout', 'deadline')
+        self._log = self.make_logger(log_path, name, width, resume_offset)
+        self._store = Store(width, track_deadlines=True)
+        self._layout = layout if layout is not None else plan_layout(width, spread=self.wide_layout)
+        self._placement = placement
+        self._time = 0
+        self._position = 0
+        self._searches = 0 #searches done by the strategy, to limit them without depending on the machine (see lookahead)
+
+
+    def make_logger(self, log_path: str, name: str, width: int, resume_offset: Optional[int] = None) -> Logger:
+        """Returns the Logger of the actions of the strategy (a buffered one, services can give another one)"""
+
+        return Logger(log_path, name, width, LOG_BUFFER, resume_offset=resume_offset)
+
+
+    def cash(self) -> int:
+        """Returns the store's cash at that moment"""
+
+        return self._store.cash()
+
+
+    def time(self) -> int:
+        """Returns the time we are at that moment"""
+
+        return self._time
+
+
+    def position(self) -> int:
+        """Returns the position we are at that moment"""
+
+        return self._position
+
+
+    def store(self) -> Store:
+        """Returns the store of the strategy"""
+
+        return self._store
+
+
+    def layout(self) -> Layout:
+        """Returns the layout of the stacks of the store"""
+
+        return self._layout
+
+
+    def close(self) -> None:
+        """Writes the rest of the log and closes it"""
+
+        self._log.close()
+
+
+    def save_checkpoint(self, path: str, arrivals: int, offset: int) -> None:
+        """
+        Writes at path a checkpoint of the strategy after arrivals containers, the next one being
+        the one of the line that starts at the byte offset of the containers file
+        """
+
+        data = self._store.to_array()
+        header = CHECKPOINT_HEADER.pack(arrivals, offset, self._time, self._position, self._searches, self._store.cash(),
+                                        self._log.offset(), self._store.width(), len(data) // 9)
+        with open(path + '.tmp', 'wb') as file:
+            file.write(CHECKPOINT_MAGIC + header + data.tobytes())
+        os.replace(path + '.tmp', path) #a crash while writing doesn't break the last checkpoint
+
+
+    def load_checkpoint(self, path: str) -> Tuple[int, int]:
+        """
+        Restores the checkpoint at path in the new strategy, whose log must have been resumed
+        where it was (resume_offset=checkpoint_log_offset(path)), and returns (arrivals, offset) as
+        given to save_checkpoint
+        """
+
+        with open(path, 'rb') as file:
+            content = file.read()
+        assert content.startswith(CHECKPOINT_MAGIC), 'not a checkpoint'
+        arrivals, offset, t, position, searches, cash, log_offset, width, n = CHECKPOINT_HEADER.unpack_from(content, len(CHECKPOINT_MAGIC))
+        assert width == self._store.width() and self._store.num_containers() == 0
+        assert log_offset == self._log.offset(), 'the log has not been resumed from the checkpoint'
+        data = array('q')
+        data.frombytes(content[len(CHECKPOINT_MAGIC) + CHECKPOINT_HEADER.size:])
+        assert len(data) == 9 * n
+
+        self._store.from_array(data)
+        self._store.add_cash(cash)
+        self._time = t
+        self._position = position
+        self._searches = searches
+        return arrivals, offset
+
+
+    def update_time(self) -> None:
+        """Updates the time once an action is done"""
+
+        self._time += 1
+
+
+    def det_position_first_container(self, c_size: int) -> Position:
+        """Returns the position that has to go the container that arrives
+        to the store based on its size"""
+
+        return self._layout.first_position(c_size, self._store)
+
+
+    def placement_cost(self, c: Container, p: Position) -> tuple:
+        """
+        Returns the cost of adding (or moving) the container c to the position p, to compare positions:
+        c will have to be moved if a container under it has to leave before c (its delivery starts
+        before the delivery of c ends and it is not expired), so the positions without such containers
+        go first, then the ones with fewer of them, then the ones where the container under c leaves
+        the soonest after c (so that the stacks stay ordered by deadline) and then the lowest ones.
+        """
+
+        blocked = 0
+        slack = math.inf
+        below = {b.identifier: b for q in range(p, p + c.size) for b in self._store.stack(q)}
+        for b in below.values():
+            if b is c:
+                continue
+            if b.delivery.start < c.delivery.end and b.delivery.end > self._time:
+                blocked += 1
+            else:
+                slack = min(slack, b.delivery.start - c.delivery.end)
+        return (blocked > 0, blocked, slack, self._store.stack_height(p))
+
+
+    def best_position(self, c: Container, candidates: Iterable[Position]) -> Position:
+        """Returns the candidate position (where c can be added) with the lowest placement cost"""
+
+        return min(candidates, key=lambda p: self.placement_cost(c, p))
+
+
+    def det_position(self, c: Container) -> Position:
+        """Returns the position that has to go the container c that arrives to the store depending on the placement"""
+
+        if self._placement == 'deadline':
+            return self.best_position(c, [q for p in self._layout.pairs(c.size) for q in (p, p + c.size)])
+        return self.det_position_first_container(c.size)
+
+
+    def det_next_position(self, p: Position) -> Position:
+        """Returns the next position in which the program has to
+        operate based on the position it is operating"""
+
+        return self._layout.next_position(p)
+
+
+    def update_position(self) -> None:
+        """Updates the position in which the program has to operate"""
+
+        self._position = self.det_next_position(self._position)
+
+
+    def expired(self, c: Container) -> bool:
+        """Returs if a container is expired at that moment"""
+
+        return self._time >= c.delivery.end
+
+
+    def deliverable(self, c: Container) -> bool:
+        """Returns if a container is deliverable at that moment"""
+
+        return c.delivery.start <= self._time < c.delivery.end
+
+
+    def add_container(self, c: Container, p: Position) -> None:
+        """Adds the container c to the position p. The action is added to the logger."""
+
+        self._store.add(c, p)
+        self._log.add(self._time, c, p)
+        self.update_time()
+
+
+    def remove_expired(self, c: Container) -> None:
+        """
+        Removes the continer c from the store without adding it's cash to the store.
+        The actions are added to the logger.
+
+        Pre: c is expired
+        """
+
+        self._store.remove(c)
+        self._log.remove(self._time, c)
+        self._log.cash(self._time, self.cash())
+
+
+    def remove_deliverable(self, c: Container) -> None:
+        """
+        Removes de continer c from the store adding it's value to the store's cash.
+        The actions are added to the logger.
+
+        Pre: c is deliverable
+        """
+
+        self._store.add_cash(c.value)
+        self._store.remove(c)
+        self._log.remove(self._time, c)
+        self._log.cash(self._time, self.cash())
+
+
+    def move_next_or_before(self, c: Container, p: Position) -> None:
+        """
+        Moves the contanier c of the position p to the other stack of its pair
+        (the second stack or the first stack of it's size).
+        The action is added to the logger.
+
+        Pre: c can be moved because is the top continer of the position of it's size
+        """
+
+        q = self._layout.partner(p)
+        self._store.move(c, q)
+        self._log.move(self._time, c, q)
+
+
+    def move_container_pila(self, c: Container, p: Position) -> None:
+        """
+        If the container is explired or can be delivered it is removed from the
+        container properly. If not it is moved to the other stack of its pair.
+
+        Pre: c can be removed because is the top continer of the position of it's size
+        """
+
+        if self.expired(c):
+            self.remove_expired(c)
+
+        elif self.deliverable(c):
+            self.remove_deliverable(c)
+
+        else: #the top container of the position cannot be delivered neither is expired
+            self.move_next_or_before(c, p)
+
+        self.update_time()
+
+
+    def empty_stack(self, p: Position, end: TimeStamp) -> None:
+        """
+        Moves (or removes) the containers of the stack p from the top to the bottom
+        until it is empty or the time arrives to end
+        """
+
+        top_c = self._store.top_container(p)
+        while top_c is not None and self._time < end:
+            self.move_container_pila(top_c, p)
+            top_c = self._store.top_container(p)
+
+
+    def cycle_pair(self, end: TimeStamp) -> None:
+        """
+        Empties the stack of the position to the other stack of its pair and then
+        the next one of the cycle, until the time arrives to end.
+        """
+
+        self.empty_stack(self._position, end) #we move all the containers from the first stack of the containers' size to the second
+        self.update_position()
+        self.empty_stack(self._position, end) #we move all the containers from the second stack of the containers' size to the first
+        self.update_position()
+
+
+    @abstractmethod
+    def on_arrival(self, c: Container) -> Position:
+        """Returns the position where the container c that arrives is added"""
+
+
+    @abstractmethod
+    def next_action(self, end: TimeStamp) -> None:
+        """Does the next actions (at least one, or moves the clock) before time end"""
+
+
+    def exec(self, c: Container):
+        """Adds the container c that arrives and does the actions of the strategy until the next one arrives"""
+
+        self.run_until(c.arrival.start) #a store fed by others (see multistore) waits for its containers
+        self.add_container(c, self.on_arrival(c))
+        self.run_until(c.arrival.end) #after we do an action we have to stop the algorithm if the next container arrives
+
+
+    def run_until(self, end: TimeStamp) -> None:
+        """Does the actions of the strategy until the time end"""
+
+        while self._time < end:
+
+            if self._store.empty(): #if the store is empty we don't have to do anything until then
+                self._time = end
+
+            else:
+                self.next_action(end)
+
+
+def run_strategy(strategy: Engine, containers_path: str, checkpoint_path: Optional[str] = None,
+                 resume: bool = False, every: int = CHECKPOINT_EVERY, chunk_size: int = CHUNK_SIZE) -> None:
+    """
+    Executes the strategy reading containers from containers_path (in blocks of chunk_size bytes, as they
+    are needed) and closes its log.
+    With checkpoint_path, a checkpoint is written there after every `every` containers, and with resume
+    the run continues from it (if there is one) instead of starting from the first container: then the
+    log of the strategy must have been resumed with checkpoint_log_offset(checkpoint_path, resume).
+    """
+
+    arrivals, start = 0, 0
+    if resume and checkpoint_path is not None and os.path.exists(checkpoint_path):
+        arrivals, start = strategy.load_checkpoint(checkpoint_path)
+
+    for block in iter_blocks(containers_path, chunk_size, start):
+        ends = block_line_ends(block) if checkpoint_path is not None else []
+        for i, c in enumerate(block_containers(block)):
+            strategy.exec(c)
+            arrivals += 1
+            if checkpoint_path is not None and arrivals % every == 0:
+                strategy.save_checkpoint(checkpoint_path, arrivals, start + ends[i]) #the blocks of a resumed run are cut elsewhere
+        start += len(block) #the blocks are one after the other
+    strategy.close()
+
+
+def init_curses():
+    """Initializes the curses library to get fancy colors and whatnots."""
+
+    curses.curs_set(0)
+    curses.start_color()
+    curses.use_default_colors()
+    for i in range(0, curses.COLORS):
+        curses.init_pair(i + 1, curses.COLOR_WHITE, i)
+
+
+def strategy_main(execute_strategy: Callable[..., None]) -> None:
+    """
+    main script of a strategy: python3 strategy.py containers log width [--headless] [--checkpoint path [--resume]]
+    Executes the strategy and shows the log with curses, or only validates it with --headless.
+    With --checkpoint the run writes checkpoints at path, and with --resume it continues from the last one.
+    """
+
+    containers_path = sys.argv[1]
+    log_path = sys.argv[2]
+    width = int(sys.argv[3])
+    options = sys.argv[4:]
+    checkpoint = {}
+    if '--checkpoint' in options:
+        checkpoint = {'checkpoint_path': options[options.index('--checkpoint') + 1], 'resume': '--resume' in options}
+
+    if '--headless' in options:
+        from validate import validate #validate imports this module
+
+        execute_strategy(containers_path, log_path, width, **checkpoint)
+        result = validate(containers_path, log_path)
+        if result.ok:
+            print(f'OK: {result.lines} lines, cash {result.cash}')
+        else:
+            print(f'line {result.error_line}: {result.error} (cash {result.cash})')
+            sys.exit(1)
+
+    else:
+        def main(stdscr: curses.window):
+            init_curses()
+            execute_strategy(containers_path, log_path, width, **checkpoint)
+            check_and_show(containers_path, log_path, stdscr)
+
+        curses.wrapper(main)
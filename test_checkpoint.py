@@ -0,0 +1,105 @@
+"""
+Regression tests of the checkpoints of run_strategy:
+
+    python3 -m pytest test_checkpoint.py
+
+A run is stopped right after a checkpoint (as if the process had been killed) and resumed
+from it, and its log must be the same as the one of a run that has not been stopped.
+"""
+
+
+import pytest
+
+from store import *
+import lookahead
+import simple
+
+
+CONTAINERS = 'fitxer2.txt'
+WIDTH = 20
+CHUNK = 200 # small blocks, so that the checkpoints fall at the start, the middle and the end of the blocks
+BUDGET = 300 # searches of lookahead, spent in the middle of the run
+
+
+class Crash(Exception):
+    """Stops a run as if its process had been killed."""
+
+
+def new_strategy(log_path: str, resume_offset: Optional[int] = None) -> Engine:
+    """Returns the strategy of simple.execute_strategy"""
+
+    layout = plan_layout(WIDTH, size_mix(CONTAINERS), simple.Strategy.wide_layout)
+    return simple.Strategy(WIDTH, log_path, layout, resume_offset=resume_offset)
+
+
+def new_lookahead(log_path: str, resume_offset: Optional[int] = None) -> Engine:
+    """Returns the strategy of lookahead.execute_strategy with a budget that runs out"""
+
+    layout = plan_layout(WIDTH, size_mix(CONTAINERS), lookahead.Strategy.wide_layout)
+    return lookahead.Strategy(WIDTH, log_path, layout, budget=BUDGET, resume_offset=resume_offset)
+
+
+def crash_after(strategy: Engine, arrivals: int) -> Engine:
+    """Makes the strategy raise Crash when the container after arrivals containers arrives"""
+
+    execute = strategy.exec
+    done = 0
+
+    def crashing_exec(c: Container):
+        nonlocal done
+        if done == arrivals:
+            raise Crash
+        execute(c)
+        done += 1
+
+    strategy.exec = crashing_exec
+    return strategy
+
+
+def resumed_log(tmp_path, new: Callable[..., Engine], arrivals: int) -> bytes:
+    """Returns the log of a run of the strategy of new stopped after arrivals containers and resumed"""
+
+    log_path, checkpoint_path = str(tmp_path / 'run.log'), str(tmp_path / 'run.ckp')
+    strategy = crash_after(new(log_path), arrivals)
+    with pytest.raises(Crash):
+        run_strategy(strategy, CONTAINERS, checkpoint_path, every=1, chunk_size=CHUNK)
+    strategy.close() #the records of the checkpoint are already in the file
+
+    strategy = new(log_path, checkpoint_log_offset(checkpoint_path, True))
+    run_strategy(strategy, CONTAINERS, checkpoint_path, resume=True, chunk_size=CHUNK)
+    with open(log_path, 'rb') as file:
+        return file.read()
+
+
+@pytest.fixture(scope='module')
+def full_log(tmp_path_factory) -> bytes:
+    """Log of the run that is not stopped"""
+
+    log_path = tmp_path_factory.mktemp('full') / 'full.log'
+    run_strategy(new_strategy(str(log_path)), CONTAINERS, chunk_size=CHUNK)
+    return log_path.read_bytes()
+
+
+@pytest.fixture(scope='module')
+def full_lookahead_log(tmp_path_factory) -> bytes:
+    """Log of the run of lookahead that is not stopped"""
+
+    log_path = tmp_path_factory.mktemp('full') / 'lookahead.log'
+    run_strategy(new_lookahead(str(log_path)), CONTAINERS, chunk_size=CHUNK)
+    return log_path.read_bytes()
+
+
+def test_block_line_ends():
+    block = b'1 1 1 0 1 2 3\n\n  \n2 1 1 0 1 2 3\n3 1 1 0 1 2 3'
+    assert block_line_ends(block) == [14, 32, len(block)]
+    assert len(block_line_ends(block)) == len(block_containers(block))
+
+
+@pytest.mark.parametrize('arrivals', [1, 16, 17, 18, 32, 33, 34, 40, 41, 42, 137, 500, 999])
+def test_resume(tmp_path, full_log: bytes, arrivals: int):
+    assert resumed_log(tmp_path, new_strategy, arrivals) == full_log
+
+
+@pytest.mark.parametrize('arrivals', [50, 400, 900])
+def test_resume_lookahead_budget(tmp_path, full_lookahead_log: bytes, arrivals: int):
+    assert resumed_log(tmp_path, new_lookahead, arrivals) == full_lookahead_log
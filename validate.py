@@ -0,0 +1,154 @@
+"""
+Headless validator of logs.
+
+Checks that the actions of a log are legal for the containers of a file without
+any curses display, reading the log line by line:
+
+    python3 validate.py containers.txt log.txt
+
+Prints the final cash of the log, or the first illegal action with its line number
+(and exits with status 1). Binary logs (see store.Logger) are accepted too.
+"""
+
+
+import sys
+from dataclasses import dataclass
+from typing import Iterator, Optional, Tuple
+
+from store import *
+
+
+@dataclass
+class Validation:
+    """Result of the validation of a log."""
+
+    ok: bool
+    cash: int
+    lines: int  # number of lines (actions) read
+    error_line: int = 0  # line of the first illegal action (0 if the log is legal)
+    error: str = ''
+
+
+def read_log(log_path: str) -> Iterator[Tuple[int, list]]:
+    """Yields the line number and the tokens of every line of a (text or binary) log."""
+
+    with open(log_path, 'rb') as file:
+        binary = file.read(len(BINARY_LOG_MAGIC)) == BINARY_LOG_MAGIC
+
+    if binary:
+        name = binary_log_name(log_path)
+        for number, (t, what, identifier, argument) in enumerate(iter_binary_log(log_path), 1):
+            if what == 'START':
+                yield number, [str(t), what, name, str(argument)]
+            elif what == 'REMOVE':
+                yield number, [str(t), what, str(identifier)]
+            elif what == 'CASH':
+                yield number, [str(t), what, str(argument)]
+            else:
+                yield number, [str(t), what, str(identifier), str(argument)]
+    else:
+        with open(log_path, 'r') as file:
+            for number, line in enumerate(file, 1):
+                yield number, line.split()
+
+
+def check_action(store: Store, containers_map: dict, tokens: list, last: int) -> Optional[str]:
+    """
+    Applies the action of the tokens of a line of the log to the store.
+    Returns why the action is illegal or None if it is legal.
+    """
+
+    if len(tokens) < 3:
+        return 'incomplete line'
+    time, what = int(tokens[0]), tokens[1]
+    if time < last:
+        return f'time {time} is before {last}'
+
+    if what == 'CASH':
+        if int(tokens[2]) != store.cash():
+            return f'cash {tokens[2]} is not the cash of the store ({store.cash()})'
+        return None
+
+    identifier = int(tokens[2])
+    if identifier not in containers_map:
+        return f'unknown container {identifier}'
+    c = containers_map[identifier]
+
+    if what == 'REMOVE':
+        if not store.is_in_store(c):
+            return f'container {identifier} is not in the store'
+        if not store.can_remove(c):
+            return f'container {identifier} cannot be removed'
+        store.remove(c)
+        if c.delivery.start <= time < c.delivery.end:
+            store.add_cash(c.value)
+        return None
+
+    if what not in ('ADD', 'MOVE') or len(tokens) < 4:
+        return 'unknown action'
+    p = int(tokens[3])
+    if p < 0 or p + c.size > store.width():
+        return f'container {identifier} does not fit in position {p}'
+
+    if what == 'ADD':
+        if time < c.arrival.start:
+            return f'container {identifier} has not arrived at time {time}'
+        if store.is_in_store(c):
+            return f'container {identifier} is already in the store'
+        if not store.can_add(c, p):
+            return f'container {identifier} cannot be added to position {p}'
+        store.add(c, p)
+
+    else: #MOVE
+        if not store.is_in_store(c):
+            return f'container {identifier} is not in the store'
+        if not store.can_move(c, p):
+            return f'container {identifier} cannot be moved to position {p}'
+        store.remove(c)
+        if not store.can_add(c, p): #the container was under itself
+            return f'container {identifier} cannot be moved to position {p}'
+        store.add(c, p)
+    return None
+
+
+def validate(containers_path: str, log_path: str) -> Validation:
+    """Checks that the actions of the log at log_path with the containers at containers_path are legal."""
+
+    containers_map = {c.identifier: c for c in iter_containers(containers_path)}
+    lines = read_log(log_path)
+
+    number, tokens = next(lines, (1, []))
+    if len(tokens) != 4 or tokens[0] != '0' or tokens[1] != 'START':
+        return Validation(False, 0, number, number, 'the log does not start with START')
+    store = Store(int(tokens[3]))
+
+    last = 0
+    for number, tokens in lines:
+        try:
+            error = check_action(store, containers_map, tokens, last)
+        except ValueError:
+            error = 'wrong number'
+        if error is not None:
+            return Validation(False, store.cash(), number, number, error)
+        last = int(tokens[0])
+    return Validation(True, store.cash(), number)
+
+
+def main():
+    """main script"""
+
+    if len(sys.argv) != 3:
+        print('usage: python3 validate.py containers_file log_file', file=sys.stderr)
+        sys.exit(2)
+
+    result = validate(sys.argv[1], sys.argv[2])
+    if result.ok:
+        print(f'OK: {result.lines} lines, cash {result.cash}')
+    else:
+        print(f'line {result.error_line}: {result.error} (cash {result.cash})')
+        sys.exit(1)
+
+
+# start main script when program executed
+if __name__ == '__main__':
+    main()